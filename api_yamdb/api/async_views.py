@@ -0,0 +1,120 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+
+from reviews.models import Comment, Review, Title
+from .filters import TitleFilter
+from .serializers import (
+    CommentSerializer, ReviewSerializer, TitleDetailSerializer, TitleSerializer
+)
+from .views import TitleViewSet
+
+
+def _json(data, status=200):
+    return JsonResponse(
+        data, status=status, safe=False,
+        json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def _paginated_data(request, queryset, serializer_class):
+    """Пагинация в том же формате, что и у синхронных вьюсетов."""
+    paginator = PageNumberPagination()
+    page = paginator.paginate_queryset(queryset, Request(request))
+    return paginator.get_paginated_response(
+        serializer_class(page, many=True).data
+    ).data
+
+
+def _title_queryset():
+    return TitleViewSet.queryset.all()
+
+
+def _review_queryset(title_id):
+    get_object_or_404(Title.objects.alive(), pk=title_id)
+    return Review.objects.alive().filter(
+        title_id=title_id
+    ).select_related('author')
+
+
+def _comment_queryset(title_id, review_id):
+    get_object_or_404(
+        Review.objects.alive().filter(title__deleted_at__isnull=True),
+        pk=review_id, title_id=title_id
+    )
+    return Comment.objects.filter(
+        review_id=review_id
+    ).select_related('author')
+
+
+def _title_list(request):
+    queryset = TitleFilter(request.GET, queryset=_title_queryset()).qs
+    return _paginated_data(request, queryset, TitleSerializer)
+
+
+def _title_detail(request, title_id):
+    return TitleDetailSerializer(
+        get_object_or_404(_title_queryset(), pk=title_id)
+    ).data
+
+
+def _review_list(request, title_id):
+    return _paginated_data(
+        request, _review_queryset(title_id), ReviewSerializer
+    )
+
+
+def _review_detail(request, title_id, review_id):
+    return ReviewSerializer(
+        get_object_or_404(_review_queryset(title_id), pk=review_id)
+    ).data
+
+
+def _comment_list(request, title_id, review_id):
+    return _paginated_data(
+        request, _comment_queryset(title_id, review_id), CommentSerializer
+    )
+
+
+def _comment_detail(request, title_id, review_id, comment_id):
+    return CommentSerializer(
+        get_object_or_404(
+            _comment_queryset(title_id, review_id), pk=comment_id
+        )
+    ).data
+
+
+def async_read_view(func):
+    """
+    Превращает синхронную функцию чтения в async-вью.
+    Вся работа с ORM и сериализация выполняется за один переход
+    в пул потоков, а не за один на каждый слой обработки запроса.
+    """
+    run = sync_to_async(func)
+
+    async def view(request, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return _json(
+                {'detail': f'Метод {request.method} не разрешен.'},
+                status=405
+            )
+        try:
+            data = await run(request, **kwargs)
+        except (Http404, NotFound):
+            return _json({'detail': 'Страница не найдена.'}, status=404)
+        return _json(data)
+
+    view.__name__ = func.__name__.lstrip('_')
+    view.__doc__ = func.__doc__
+    return view
+
+
+title_list = async_read_view(_title_list)
+title_detail = async_read_view(_title_detail)
+review_list = async_read_view(_review_list)
+review_detail = async_read_view(_review_detail)
+comment_list = async_read_view(_comment_list)
+comment_detail = async_read_view(_comment_detail)
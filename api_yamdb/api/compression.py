@@ -0,0 +1,175 @@
+"""
+Сжатие ответов API с согласованием по Accept-Encoding.
+
+Поддерживаются gzip, а также brotli и zstd, если установлены пакеты
+brotli и zstandard (необязательные зависимости из
+requirements-compression.txt). Сжимаются только ответы на пути из
+`COMPRESSION_PATH_PREFIXES` длиннее `COMPRESSION_MIN_SIZE` байт;
+потоковые ответы сжимаются по частям. Уровни сжатия задаются
+в `COMPRESSION_LEVELS`.
+"""
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .middleware import AsyncCapableMiddleware
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Порядок предпочтения, если клиент принимает несколько кодировок.
+PREFERENCE = ('zstd', 'br', 'gzip')
+NO_TRANSFORM = re.compile(r'\bno-transform\b')
+
+
+class GzipCompressor:
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+COMPRESSORS = {'gzip': GzipCompressor}
+if brotli is not None:
+    COMPRESSORS['br'] = BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS['zstd'] = ZstdCompressor
+
+
+def choose_encoding(accept_encoding, available):
+    """Лучшая кодировка из `available`, которую принимает клиент."""
+    accepted = set()
+    # Кодировки с q=0 явно запрещены, и `*` их не разрешает.
+    rejected = set()
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        params = params.replace(' ', '')
+        try:
+            quality = float(params[2:]) if params.startswith('q=') else 1
+        except ValueError:
+            quality = 0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+        else:
+            rejected.add(coding.strip().lower())
+    for encoding in PREFERENCE:
+        if encoding in available and encoding not in rejected and (
+            encoding in accepted or '*' in accepted
+        ):
+            return encoding
+    return 'identity'
+
+
+def compress(encoding, data, level=None):
+    """Сжимает `data` целиком."""
+    if level is None:
+        level = settings.COMPRESSION_LEVELS[encoding]
+    compressor = COMPRESSORS[encoding](level)
+    return compressor.compress(data) + compressor.finish()
+
+
+def compress_stream(encoding, chunks, level):
+    """Сжимает поток, отдавая каждую часть сразу после сжатия."""
+    compressor = COMPRESSORS[encoding](level)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(AsyncCapableMiddleware):
+    """Сжимает ответы API кодировкой, выбранной по Accept-Encoding."""
+
+    def call(self, request):
+        return self.process_response(request, self.get_response(request))
+
+    async def acall(self, request):
+        return self.process_response(
+            request, await self.get_response(request)
+        )
+
+    def process_response(self, request, response):
+        if not request.path.startswith(settings.COMPRESSION_PATH_PREFIXES):
+            return response
+        if not response.streaming and (
+            len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        # Ответ зависит от Accept-Encoding, даже если не будет сжат.
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.has_header('Content-Encoding') or NO_TRANSFORM.search(
+            response.get('Cache-Control', '')
+        ):
+            return response
+        encoding = choose_encoding(
+            request.headers.get('Accept-Encoding', ''), COMPRESSORS
+        )
+        if encoding == 'identity':
+            return response
+        level = settings.COMPRESSION_LEVELS[encoding]
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                encoding, response.streaming_content, level
+            )
+            del response['Content-Length']
+        else:
+            compressed = compress(encoding, response.content, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # Сжатое тело отличается побайтно, поэтому сильный ETag
+        # становится слабым, как в django.middleware.gzip.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,54 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# app_label модели таблицы django.core.cache.backends.db.DatabaseCache.
+CACHE_APP_LABEL = 'django_cache'
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def enable_replica_reads():
+    """Включает чтение с реплик; возвращает токен для `reset`."""
+    return _read_from_replica.set(True)
+
+
+def reset_replica_reads(token):
+    _read_from_replica.reset(token)
+
+
+@contextmanager
+def read_from_replica():
+    """Направляет чтения внутри блока на реплики базы данных."""
+    token = enable_replica_reads()
+    try:
+        yield
+    finally:
+        reset_replica_reads(token)
+
+
+class ReplicaRouter:
+    """
+    Роутер базы данных: запись всегда в основную базу,
+    чтение на реплику только внутри `read_from_replica()`.
+    Таблица DatabaseCache читается только из основной базы:
+    отставший кэш на реплике вернул бы старые корзины троттлинга
+    и закрепления.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            _read_from_replica.get()
+            and settings.DATABASE_REPLICAS
+            and model._meta.app_label != CACHE_APP_LABEL
+        ):
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -0,0 +1,101 @@
+"""
+Встраивание отзывов и комментариев в ответ произведения:
+    /titles/<id>/?expand=reviews,reviews.comments
+        &reviews_limit=<n>&comments_limit=<m>
+
+Страница произведения загружается одним запросом и фиксированным
+числом SQL-запросов: n последних отзывов одним запросом с LIMIT,
+по m последних комментариев к каждому из них — одним запросом
+с оконной функцией ROW_NUMBER() по отзыву.
+"""
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from rest_framework.exceptions import ValidationError
+
+from reviews.models import Comment
+
+REVIEWS = 'reviews'
+COMMENTS = 'reviews.comments'
+EXPANSIONS = (REVIEWS, COMMENTS)
+
+
+def _limit(params, name, default):
+    try:
+        limit = int(params.get(name, default))
+    except ValueError:
+        raise ValidationError({name: 'Ожидается целое число.'})
+    return max(1, min(limit, settings.EXPAND_MAX_LIMIT))
+
+
+def parse(request):
+    """
+    Запрошенные встраивания: {'reviews': n, 'reviews.comments': m}
+    с ограничениями по уровням; пустой словарь — встраивать нечего.
+    """
+    params = request.query_params
+    names = {
+        name.strip() for name in params.get('expand', '').split(',')
+        if name.strip()
+    }
+    unknown = names - set(EXPANSIONS)
+    if unknown:
+        raise ValidationError({
+            'expand': f'Допустимые значения: {", ".join(EXPANSIONS)}.'
+        })
+    limits = {}
+    if names:
+        limits[REVIEWS] = _limit(
+            params, 'reviews_limit', settings.EXPAND_REVIEWS_LIMIT
+        )
+    if COMMENTS in names:
+        limits[COMMENTS] = _limit(
+            params, 'comments_limit', settings.EXPAND_COMMENTS_LIMIT
+        )
+    return limits
+
+
+def top_per_group(queryset, group_field, limit):
+    """
+    Не больше limit первых в порядке queryset строк каждой группы
+    одним запросом: ROW_NUMBER() OVER (PARTITION BY group_field).
+    """
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    ranked = queryset.annotate(row_number=Window(
+        expression=RowNumber(),
+        partition_by=F(group_field),
+        order_by=[
+            F(name[1:]).desc() if name.startswith('-') else F(name).asc()
+            for name in ordering
+        ],
+    )).order_by().values('pk', 'row_number')
+    sql, params = ranked.query.sql_with_params()
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT ranked.id FROM ({sql}) ranked '
+        f'WHERE ranked.row_number <= %s',
+        (*params, limit)
+    ))
+
+
+def embed(data, title, limits, review_serializer, comment_serializer):
+    """Добавляет в данные произведения отзывы и их комментарии."""
+    reviews = list(
+        title.reviews.alive().select_related('author')[:limits[REVIEWS]]
+    )
+    data[REVIEWS] = review_serializer(reviews, many=True).data
+    if COMMENTS not in limits or not reviews:
+        return data
+    comments = {review.pk: [] for review in reviews}
+    for comment in top_per_group(
+        Comment.objects.filter(review__in=reviews).select_related(
+            'author'
+        ).order_by('-pub_date', '-id'),
+        'review_id', limits[COMMENTS]
+    ):
+        comments[comment.review_id].append(comment)
+    for review, item in zip(reviews, data[REVIEWS]):
+        item['comments'] = comment_serializer(
+            comments[review.pk], many=True
+        ).data
+    return data
@@ -1,13 +1,92 @@
 import django_filters as filters
+from django.db.models import Exists, F, OuterRef
+from rest_framework.filters import OrderingFilter
 
-from reviews.models import Title
+from reviews.models import Category, Title
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Список значений через запятую."""
 
 
 class TitleFilter(filters.FilterSet):
+    """
+    Фильтр произведений. `genre` и `category` принимают списки слагов
+    через запятую; `genre_match=all` оставляет произведения со всеми
+    указанными жанрами, по умолчанию — хотя бы с одним. Фильтры
+    построены на подзапросах EXISTS/IN, поэтому не дают дублей
+    и не требуют DISTINCT. Диапазоны года и рейтинга идут по хранимым
+    столбцам с индексами, без HAVING по агрегату отзывов.
+    """
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
-    category = filters.CharFilter(field_name='category__slug')
-    genre = filters.CharFilter(field_name='genre__slug')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
+    category = CharInFilter(method='filter_category')
+    genre = CharInFilter(method='filter_genre')
+    genre_match = filters.ChoiceFilter(
+        choices=(('any', 'any'), ('all', 'all')), method='filter_noop'
+    )
 
     class Meta:
         model = Title
         fields = ['name', 'year', 'category', 'genre']
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category_id__in=Category.objects.filter(
+            slug__in=value
+        ).values('id'))
+
+    def filter_genre(self, queryset, name, value):
+        slugs = set(value)
+        if self.form.cleaned_data.get('genre_match') != 'all':
+            return queryset.filter(
+                Exists(genre_links(OuterRef('pk'), slugs))
+            )
+        for slug in slugs:
+            queryset = queryset.filter(
+                Exists(genre_links(OuterRef('pk'), (slug,)))
+            )
+        return queryset
+
+    def filter_noop(self, queryset, name, value):
+        # Режим учитывается в filter_genre.
+        return queryset
+
+
+def genre_links(title_id, slugs):
+    """Связи произведения с жанрами из `slugs` в таблице title_genre."""
+    return Title.genre.through.objects.filter(
+        title_id=title_id, genre__slug__in=slugs
+    )
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """
+    Сортировка произведений по белому списку полей из `ordering_fields`.
+    Для каждого поля есть индекс (поле, id): id добавляется в конец
+    для устойчивой пагинации, произведения без оценок всегда в конце.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        return queryset.order_by(*title_ordering(ordering))
+
+
+def title_ordering(ordering):
+    """Выражения сортировки с nulls_last для рейтинга и id в конце."""
+    fields = list(ordering)
+    if not any(field.lstrip('-') == 'id' for field in fields):
+        fields.append('-id' if fields[0].startswith('-') else 'id')
+    expressions = []
+    for field in fields:
+        name = field.lstrip('-')
+        nulls_last = name == 'rating'
+        expressions.append(
+            F(name).desc(nulls_last=nulls_last) if field.startswith('-')
+            else F(name).asc(nulls_last=nulls_last)
+        )
+    return expressions
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import redoc
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает документацию ReDoc: JSON-спецификацию с хешем, '
+        'ее сжатые варианты и готовую страницу.'
+    )
+
+    def handle(self, *args, **options):
+        bundle = redoc.build_bundle()
+        redoc.write_bundle(bundle, settings.REDOC_BUILD_DIR)
+        self.stdout.write(
+            f'Спецификация {bundle.spec_name} '
+            f'({", ".join(sorted(bundle.variants))}) сохранена '
+            f'в {settings.REDOC_BUILD_DIR}.'
+        )
@@ -0,0 +1,218 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ListSerializer
+
+from .middleware import AsyncCapableMiddleware
+from .query_hooks import query_hook
+
+SECONDS_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Накопитель метрик одного запроса."""
+    __slots__ = ('queries', 'db_seconds', 'serialize_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += time.perf_counter() - started
+
+
+def current_request_metrics():
+    """Метрики текущего запроса или None, если сбор выключен."""
+    return _current.get()
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+METRICS = (
+    ('yamdb_request_queries', 'SQL-запросов на запрос', QUERY_BUCKETS),
+    ('yamdb_request_db_seconds', 'Время в базе данных', SECONDS_BUCKETS),
+    (
+        'yamdb_request_serialize_seconds',
+        'Время сериализации и рендеринга ответа DRF без запросов к базе',
+        SECONDS_BUCKETS
+    ),
+    ('yamdb_request_seconds', 'Полное время запроса', SECONDS_BUCKETS),
+)
+
+
+class MetricsRegistry:
+    """Гистограммы метрик по эндпоинтам в памяти процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def observe(self, route, metrics, total_seconds):
+        values = (
+            metrics.queries, metrics.db_seconds,
+            metrics.serialize_seconds, total_seconds
+        )
+        with self.lock:
+            histograms = self.routes.get(route)
+            if histograms is None:
+                histograms = self.routes[route] = [
+                    Histogram(buckets) for _, _, buckets in METRICS
+                ]
+            for histogram, value in zip(histograms, values):
+                histogram.observe(value)
+
+    def clear(self):
+        with self.lock:
+            self.routes.clear()
+
+    def to_prometheus(self):
+        """Выгрузка в текстовом формате Prometheus."""
+        lines = []
+        with self.lock:
+            routes = sorted(self.routes.items())
+            for index, (name, help_text, _) in enumerate(METRICS):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (method, view), histograms in routes:
+                    labels = (
+                        f'method="{_escape(method)}",view="{_escape(view)}"'
+                    )
+                    histogram = histograms[index]
+                    for bound, count in histogram.cumulative():
+                        lines.append(
+                            f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+                        )
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(
+                        f'{name}_count{{{labels}}} {sum(histogram.counts)}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Считает SQL-запросы, время в базе и полное время по эндпоинтам.
+    При `METRICS_ENABLED = False` не подключается вовсе.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def call(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with query_hook(metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.observe(request, metrics, started)
+        return response
+
+    async def acall(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with query_hook(metrics):
+                response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.observe(request, metrics, started)
+        return response
+
+    @staticmethod
+    def observe(request, metrics, started):
+        match = request.resolver_match
+        registry.observe(
+            (request.method, match.view_name if match else 'unmatched'),
+            metrics,
+            time.perf_counter() - started
+        )
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSON-рендерер DRF, учитывающий время сериализации ответа."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            metrics.serialize_seconds += time.perf_counter() - started
+
+
+class TimedDataMixin:
+    """
+    Миксин сериализатора, учитывающий время вычисления `.data`
+    в метриках запроса. Запросы к базе во время сериализации
+    (ленивые связи, prefetch) уже учтены во времени базы и вычитаются.
+    Спискам нужен `list_serializer_class = TimedListSerializer` в Meta.
+    """
+
+    @property
+    def data(self):
+        metrics = _current.get()
+        if metrics is None:
+            return super().data
+        started = time.perf_counter()
+        db_seconds = metrics.db_seconds
+        try:
+            return super().data
+        finally:
+            metrics.serialize_seconds += (
+                time.perf_counter() - started
+                - (metrics.db_seconds - db_seconds)
+            )
+
+
+class TimedListSerializer(TimedDataMixin, ListSerializer):
+    pass
@@ -0,0 +1,138 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed, InvalidToken
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from .db_routers import enable_replica_reads, reset_replica_reads
+
+REPLICA_PIN_KEY = 'replica-pin:{user_id}'
+
+
+def get_token_user_id(request):
+    """Достает id пользователя из JWT без обращения к базе данных."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        token = authentication.get_validated_token(raw_token)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+class AsyncCapableMiddleware:
+    """
+    Основа middleware, которые работают и в синхронной, и в асинхронной
+    цепочке обработчиков. Под ASGI Django передает им асинхронный
+    `get_response`, и запрос не переводится в поток ради middleware.
+    Наследники реализуют `call` и корутину `acall`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так Django распознает экземпляр как асинхронный, см.
+            # django.utils.deprecation.MiddlewareMixin.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        return self.call(request)
+
+    def call(self, request):
+        raise NotImplementedError
+
+    async def acall(self, request):
+        raise NotImplementedError
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    """
+    Отправляет GET/HEAD-запросы к вьюсетам с `use_read_replica = True`
+    на реплики. После записи пользователь на `REPLICA_PIN_SECONDS`
+    закрепляется за основной базой, чтобы видеть свои изменения.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.is_async:
+            self.process_view = self.aprocess_view
+
+    def call(self, request):
+        response = self.get_response(request)
+        self.reset(request)
+        if self.writes(request, response):
+            self.pin_to_primary(request)
+        return response
+
+    async def acall(self, request):
+        response = await self.get_response(request)
+        self.reset(request)
+        if self.writes(request, response):
+            await sync_to_async(self.pin_to_primary)(request)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.replica_view(request, view_func) and not self.pinned(request):
+            request._replica_token = enable_replica_reads()
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # Чтение реплики включается в контексте запроса, а не в потоке
+        # sync_to_async: иначе его нельзя сбросить в `acall`.
+        if self.replica_view(request, view_func) and not (
+            await sync_to_async(self.pinned)(request)
+        ):
+            request._replica_token = enable_replica_reads()
+        return None
+
+    @staticmethod
+    def replica_view(request, view_func):
+        view_class = getattr(view_func, 'cls', None)
+        return (
+            request.method in ('GET', 'HEAD')
+            and bool(settings.DATABASE_REPLICAS)
+            and getattr(view_class, 'use_read_replica', False)
+        )
+
+    @staticmethod
+    def writes(request, response):
+        return (
+            request.method not in SAFE_METHODS and response.status_code < 400
+        )
+
+    @staticmethod
+    def reset(request):
+        token = getattr(request, '_replica_token', None)
+        if token is not None:
+            reset_replica_reads(token)
+
+    def pinned(self, request):
+        user_id = get_token_user_id(request)
+        return user_id is not None and bool(
+            cache.get(REPLICA_PIN_KEY.format(user_id=user_id))
+        )
+
+    def pin_to_primary(self, request):
+        user_id = get_token_user_id(request)
+        if user_id is not None:
+            cache.set(
+                REPLICA_PIN_KEY.format(user_id=user_id),
+                True,
+                settings.REPLICA_PIN_SECONDS
+            )
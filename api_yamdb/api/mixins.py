@@ -1,6 +1,12 @@
+from django.conf import settings
 from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from .serializers import requested_fields
+
 
 class PartialUpdateModelMixin(mixins.UpdateModelMixin):
     """
@@ -16,6 +22,62 @@ class PartialUpdateModelMixin(mixins.UpdateModelMixin):
         return super().update(request, *args, **kwargs)
 
 
+class SparseFieldsQuerysetMixin:
+    """
+    Миксин, который при ?fields=a,b загружает из базы только колонки
+    и связи запрошенных полей, см. serializers.SparseFieldsMixin.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = requested_fields(self.request)
+        serializer_class = self.get_serializer_class()
+        if fields is None or not hasattr(serializer_class, 'sparse_queryset'):
+            return queryset
+        return serializer_class.sparse_queryset(queryset, fields)
+
+
+class BatchRetrieveMixin:
+    """
+    Миксин для получения нескольких объектов одним запросом:
+    GET .../batch/?ids=1,2,3 или POST .../batch/ {"ids": [1, 2, 3]}
+    для длинных списков. Объекты загружаются одним in_bulk с обычным
+    планом prefetch и возвращаются в порядке ids; не найденные id
+    перечисляются в missing.
+    """
+
+    def get_batch_ids(self, request):
+        if request.method == 'POST':
+            ids = request.data.get('ids')
+        else:
+            ids = request.query_params.get('ids', '').split(',')
+        if not isinstance(ids, list) or not ids:
+            raise ValidationError({'ids': 'Ожидается непустой список id.'})
+        try:
+            ids = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            raise ValidationError({'ids': 'id должны быть целыми числами.'})
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.BATCH_MAX_IDS:
+            raise ValidationError({
+                'ids': f'Не больше {settings.BATCH_MAX_IDS} id за запрос.'
+            })
+        return ids
+
+    @action(
+        methods=['get', 'post'], detail=False, url_path='batch',
+        permission_classes=(AllowAny,)
+    )
+    def batch(self, request, *args, **kwargs):
+        ids = self.get_batch_ids(request)
+        objects = self.filter_queryset(self.get_queryset()).in_bulk(ids)
+        found = [objects[pk] for pk in ids if pk in objects]
+        return Response({
+            'results': self.get_serializer(found, many=True).data,
+            'missing': [pk for pk in ids if pk not in objects],
+        })
+
+
 class ListCreateDestroyMixin(
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
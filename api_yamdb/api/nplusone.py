@@ -0,0 +1,136 @@
+"""
+Поиск N+1 запросов для разработки и тестов.
+
+Middleware считает за запрос к API (пути из `NPLUSONE_PATH_PREFIXES`):
+    - SQL-запросы из полей сериализаторов DRF — ленивые загрузки
+      связей, которые должны были прийти через select_related или
+      prefetch_related, с полем и связью модели, которые их вызвали;
+    - повторы запросов одинаковой формы: Django передает значения
+      параметров отдельно, поэтому текст SQL и есть форма запроса.
+Если ленивых загрузок одной связи больше `NPLUSONE_LAZY_LOAD_THRESHOLD`
+или одинаковых запросов больше `NPLUSONE_REPEAT_THRESHOLD`, пишет
+предупреждение в лог api.nplusone или, при `NPLUSONE_RAISE = True`,
+выбрасывает NPlusOneError — так N+1 ловят тесты (см. tests/conftest.py).
+
+Подключается только при `NPLUSONE_ENABLED = True`, по умолчанию
+в режиме DEBUG.
+"""
+import logging
+import os
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .middleware import AsyncCapableMiddleware
+from .query_hooks import query_hook
+
+logger = logging.getLogger(__name__)
+
+SERIALIZERS_FILE = os.path.join('rest_framework', 'serializers.py')
+# Управление транзакциями повторяется законно и формой не считается.
+TRANSACTION_STATEMENTS = (
+    'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE'
+)
+
+
+class NPlusOneError(Exception):
+    """Запрос к API выполнил N+1 SQL-запросов."""
+
+
+def serializer_field(frame):
+    """
+    Поле сериализатора, которое преобразуется в стеке frame, и связь
+    модели за ним: ('TitleSerializer.genre', 'reviews.Title.genre')
+    или None.
+    """
+    while frame is not None:
+        code = frame.f_code
+        if (
+            code.co_name == 'to_representation'
+            and code.co_filename.endswith(SERIALIZERS_FILE)
+        ):
+            field = frame.f_locals.get('field')
+            instance = frame.f_locals.get('instance')
+            if field is not None and instance is not None:
+                return (
+                    f'{type(field.parent).__name__}.{field.field_name}',
+                    f'{instance._meta.label}.{field.source}'
+                    if hasattr(instance, '_meta') else field.source,
+                )
+        frame = frame.f_back
+    return None
+
+
+class QueryShapes:
+    """Формы SQL-запросов и ленивые загрузки одного запроса к API."""
+
+    def __init__(self):
+        self.shapes = Counter()
+        self.origins = {}
+        self.lazy_loads = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            self.shapes[sql] += 1
+        origin = serializer_field(sys._getframe(1))
+        if origin is not None:
+            self.lazy_loads[origin] += 1
+            self.origins[sql] = origin
+        return execute(sql, params, many, context)
+
+    def problems(self, lazy_load_threshold, repeat_threshold):
+        """Описания превышений порогов."""
+        found = [
+            f'{count} ленивых загрузок {relation} в поле {field}'
+            for (field, relation), count in self.lazy_loads.items()
+            if count > lazy_load_threshold
+        ]
+        for sql, count in self.shapes.items():
+            if count <= repeat_threshold:
+                continue
+            origin = self.origins.get(sql)
+            where = f' из поля {origin[0]}' if origin else ''
+            found.append(f'{count} одинаковых запросов{where}: {sql}')
+        return found
+
+
+class NPlusOneMiddleware(AsyncCapableMiddleware):
+    """Находит N+1 запросы, см. модуль."""
+
+    def __init__(self, get_response):
+        if not settings.NPLUSONE_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def call(self, request):
+        if not request.path.startswith(settings.NPLUSONE_PATH_PREFIXES):
+            return self.get_response(request)
+        with query_hook(QueryShapes()) as shapes:
+            response = self.get_response(request)
+        self.check(request, shapes)
+        return response
+
+    async def acall(self, request):
+        if not request.path.startswith(settings.NPLUSONE_PATH_PREFIXES):
+            return await self.get_response(request)
+        with query_hook(QueryShapes()) as shapes:
+            response = await self.get_response(request)
+        self.check(request, shapes)
+        return response
+
+    @staticmethod
+    def check(request, shapes):
+        problems = shapes.problems(
+            settings.NPLUSONE_LAZY_LOAD_THRESHOLD,
+            settings.NPLUSONE_REPEAT_THRESHOLD
+        )
+        if problems:
+            message = (
+                f'N+1 в {request.method} {request.path}:\n'
+                + '\n'.join(problems)
+            )
+            if settings.NPLUSONE_RAISE:
+                raise NPlusOneError(message)
+            logger.warning(message)
@@ -0,0 +1,176 @@
+"""
+Профилирование отдельного запроса по требованию администратора.
+
+Запрос с заголовком `X-Profile` или параметром `?profile` от
+администратора выполняется под cProfile; отчет (самые дорогие функции,
+SQL-запросы с длительностями, время сериализаторов) сохраняется
+в кэше на `PROFILER_TTL` секунд и отдается по адресу из заголовка
+ответа `X-Profile-URL`. Краткая сводка — в заголовке `Server-Timing`.
+
+Запросы без заголовка и параметра проходят без какой-либо обработки;
+при `PROFILER_ENABLED = False` middleware не подключается вовсе.
+Под ASGI профилируемый запрос выполняется в отдельном потоке целиком:
+cProfile видит только свой поток.
+"""
+import cProfile
+import os
+import pstats
+import time
+import uuid
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import reverse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .middleware import AsyncCapableMiddleware
+from .query_hooks import query_hook
+
+HEADER = 'HTTP_X_PROFILE'
+PARAM = 'profile'
+CACHE_KEY = 'profile:{}'
+SERIALIZERS_FILE = os.path.join('rest_framework', 'serializers.py')
+
+
+class QueryLog:
+    """SQL-запросы профилируемого запроса с длительностями."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.queries = []
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            if len(self.queries) < self.limit:
+                self.queries.append({
+                    'sql': sql,
+                    'ms': round(elapsed * 1000, 3),
+                    'database': context['connection'].alias,
+                })
+
+
+def _is_admin(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        user = result[0] if result else None
+    return user is not None and user.is_authenticated and user.is_admin
+
+
+def _functions(stats, limit):
+    """Самые дорогие функции по суммарному времени с вызовами."""
+    rows = sorted(
+        stats.stats.items(), key=lambda item: item[1][3], reverse=True
+    )
+    return [
+        {
+            'function': f'{filename}:{line}({name})',
+            'calls': calls,
+            'own_ms': round(own * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _)
+        in rows[:limit]
+    ]
+
+
+def _serializer_seconds(stats):
+    """
+    Время в свойствах data сериализаторов DRF. Вложенные вызовы
+    входят во внешний, поэтому берется наибольшее суммарное время.
+    """
+    return max(
+        (
+            cumulative
+            for (filename, _, name), (_, _, _, cumulative, _)
+            in stats.stats.items()
+            if name == 'data' and filename.endswith(SERIALIZERS_FILE)
+        ),
+        default=0.0
+    )
+
+
+def _requested(request):
+    return HEADER in request.META or PARAM in request.GET
+
+
+class ProfilerMiddleware(AsyncCapableMiddleware):
+    """Профилирует запросы администратора с X-Profile или ?profile."""
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def call(self, request):
+        return self.handle(request, self.get_response)
+
+    async def acall(self, request):
+        if not _requested(request):
+            return await self.get_response(request)
+        # Синхронный код async-вью внутри async_to_sync asgiref
+        # выполняет в вызвавшем потоке, то есть под профилировщиком.
+        return await sync_to_async(self.handle)(
+            request, async_to_sync(self.get_response)
+        )
+
+    def handle(self, request, get_response):
+        if not _requested(request) or not _is_admin(request):
+            return get_response(request)
+        return self.profile(request, get_response)
+
+    def profile(self, request, get_response):
+        queries = QueryLog(settings.PROFILER_MAX_QUERIES)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with query_hook(queries):
+            profiler.enable()
+            try:
+                response = get_response(request)
+            finally:
+                profiler.disable()
+        total = time.perf_counter() - started
+        stats = pstats.Stats(profiler)
+        serializer = _serializer_seconds(stats)
+        report = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 3),
+            'serializer_ms': round(serializer * 1000, 3),
+            'db_ms': round(queries.seconds * 1000, 3),
+            'query_count': queries.count,
+            'queries': queries.queries,
+            'functions': _functions(stats, settings.PROFILER_TOP_FUNCTIONS),
+        }
+        profile_id = uuid.uuid4().hex
+        cache.set(
+            CACHE_KEY.format(profile_id), report, settings.PROFILER_TTL
+        )
+        response['X-Profile-Id'] = profile_id
+        response['X-Profile-URL'] = reverse('profile', args=[profile_id])
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={value * 1000:.3f}' for name, value in (
+                ('total', total), ('db', queries.seconds),
+                ('serializer', serializer),
+            )
+        )
+        return response
+
+
+def get_report(profile_id):
+    """Сохраненный отчет или None, если срок хранения истек."""
+    return cache.get(CACHE_KEY.format(profile_id))
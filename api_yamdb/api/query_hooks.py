@@ -0,0 +1,38 @@
+"""
+Обертки SQL-запросов (execute_wrapper) на время запроса к API.
+
+`connection.execute_wrapper()` действует только на соединение текущего
+потока. Под ASGI middleware работает в цикле событий, а ORM — в потоке
+из `sync_to_async`, поэтому обертки middleware хранятся в ContextVar:
+он копируется в поток вместе с контекстом запроса. На каждое
+соединение при подключении ставится одна обертка, которая вызывает
+обертки из текущего контекста.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+_hooks = ContextVar('query_hooks', default=())
+
+
+@contextmanager
+def query_hook(hook):
+    """Вызывает `hook` как execute_wrapper для запросов внутри блока."""
+    token = _hooks.set(_hooks.get() + (hook,))
+    try:
+        yield hook
+    finally:
+        _hooks.reset(token)
+
+
+def dispatch(execute, sql, params, many, context):
+    # Первая обертка — внешняя, как у connection.execute_wrappers.
+    for hook in reversed(_hooks.get()):
+        execute = partial(hook, execute)
+    return execute(sql, params, many, context)
+
+
+def install(sender, connection, **kwargs):
+    """Обработчик connection_created: ставит `dispatch` на соединение."""
+    if dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.append(dispatch)
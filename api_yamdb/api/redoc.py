@@ -0,0 +1,128 @@
+"""
+Документация API (ReDoc) без рендеринга шаблона на каждый запрос.
+
+Команда `build_redoc` переводит `static/redoc.yaml` в JSON, считает хеш
+содержимого и сохраняет в `REDOC_BUILD_DIR` спецификацию `<хеш>.json`
+вместе со сжатыми вариантами `.gz` и `.br` (если установлен пакет
+brotli) и готовую страницу `redoc.html`, ссылающуюся на этот хеш.
+Спецификация по хешированному адресу не меняется и кешируется навсегда,
+страница отдается с ETag. Если сборки нет, она один раз выполняется
+в памяти процесса при первом обращении.
+"""
+import gzip
+import hashlib
+import json
+from functools import lru_cache
+
+import yaml
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition, require_safe
+
+from .compression import choose_encoding
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST = 'manifest.json'
+PAGE = 'redoc.html'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+SUFFIXES = {'br': '.br', 'gzip': '.gz', 'identity': ''}
+
+
+class Bundle:
+    """Собранная спецификация: хеш, страница и варианты по кодировкам."""
+
+    def __init__(self, digest, page, variants):
+        self.digest = digest
+        self.page = page
+        self.variants = variants
+
+    @property
+    def spec_name(self):
+        return f'{self.digest}.json'
+
+
+def build_bundle(source=None):
+    """Собирает Bundle из YAML-спецификации."""
+    with open(source or settings.REDOC_SOURCE, encoding='utf-8') as file:
+        spec = yaml.safe_load(file)
+    body = json.dumps(
+        spec, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    variants = {
+        'identity': body,
+        'gzip': gzip.compress(body, compresslevel=9, mtime=0),
+    }
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=11)
+    page = render_to_string(PAGE, {
+        'spec_url': reverse('redoc-spec', kwargs={'digest': digest}),
+    }).encode()
+    return Bundle(digest, page, variants)
+
+
+def write_bundle(bundle, target):
+    """Сохраняет сборку в каталог `target`."""
+    target.mkdir(parents=True, exist_ok=True)
+    for encoding, body in bundle.variants.items():
+        (target / (bundle.spec_name + SUFFIXES[encoding])).write_bytes(body)
+    (target / PAGE).write_bytes(bundle.page)
+    (target / MANIFEST).write_text(json.dumps({
+        'digest': bundle.digest, 'encodings': sorted(bundle.variants),
+    }))
+
+
+def read_bundle(target):
+    """Читает сборку из каталога `target` или возвращает None."""
+    try:
+        manifest = json.loads((target / MANIFEST).read_text())
+        spec_name = f'{manifest["digest"]}.json'
+        variants = {
+            encoding: (target / (spec_name + SUFFIXES[encoding])).read_bytes()
+            for encoding in manifest['encodings']
+        }
+        page = (target / PAGE).read_bytes()
+    except FileNotFoundError:
+        return None
+    return Bundle(manifest['digest'], page, variants)
+
+
+@lru_cache(maxsize=None)
+def get_bundle():
+    return read_bundle(settings.REDOC_BUILD_DIR) or build_bundle()
+
+
+@require_safe
+@condition(etag_func=lambda request: get_bundle().digest)
+def redoc_page(request):
+    response = HttpResponse(
+        get_bundle().page, content_type='text/html; charset=utf-8'
+    )
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@require_safe
+def redoc_spec(request, digest):
+    bundle = get_bundle()
+    if digest != bundle.digest:
+        raise Http404
+    encoding = choose_encoding(
+        request.headers.get('Accept-Encoding', ''), bundle.variants
+    )
+    response = HttpResponse(
+        bundle.variants[encoding], content_type='application/json'
+    )
+    if encoding != 'identity':
+        response['Content-Encoding'] = encoding
+    response['Cache-Control'] = IMMUTABLE
+    response['ETag'] = f'"{digest}"'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
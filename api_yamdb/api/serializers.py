@@ -1,12 +1,75 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import MANY_RELATION_KWARGS
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews import lookups
+from reviews.models import (
+    SCORES, Category, ChangeLogEntry, Comment, Genre, Review, Title
+)
+from .metrics import TimedDataMixin, TimedListSerializer
 
 User = get_user_model()
 
 
+def requested_fields(request):
+    """
+    Поля из параметра ?fields=a,b запроса на чтение;
+    None — параметр не передан.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get('fields')
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Оставляет в ответе только поля из ?fields=a,b.
+
+    sparse_queryset сужает запрос представления до колонок этих полей.
+    По умолчанию поле читает одноименную колонку; остальное описывают
+    атрибуты Meta:
+        sparse_columns — колонки поля;
+        sparse_select_related, sparse_prefetch_related — связи,
+        которые загружаются, только если поле запрошено.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields is None:
+            return
+        unknown = fields - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+            })
+        for name in set(self.fields) - fields:
+            self.fields.pop(name)
+
+    @classmethod
+    def sparse_queryset(cls, queryset, fields):
+        meta = cls.Meta
+        columns = getattr(meta, 'sparse_columns', {})
+        select = getattr(meta, 'sparse_select_related', {})
+        prefetch = getattr(meta, 'sparse_prefetch_related', {})
+        only = {'pk'}
+        for name in fields & set(meta.fields):
+            only.update(columns.get(name, (name,)))
+        queryset = queryset.select_related(None).prefetch_related(None)
+        related = [select[name] for name in fields if name in select]
+        if related:
+            queryset = queryset.select_related(*related)
+        related = [prefetch[name] for name in fields if name in prefetch]
+        if related:
+            queryset = queryset.prefetch_related(*related)
+        return queryset.only(*only)
+
+
 class RegisterDataSerializer(serializers.Serializer):
     """Сериализатор для самостоятельной регистрации пользователя."""
     username = serializers.RegexField(
@@ -19,17 +82,18 @@ class RegisterDataSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         try:
-            user, _ = User.objects.get_or_create(
+            user, _ = User.objects.alive().get_or_create(
                 username=validated_data['username'],
                 email=validated_data['email'],
-                defaults={
-                    'confirmation_code': validated_data['confirmation_code']
-                }
             )
         except IntegrityError:
             raise serializers.ValidationError(
                 'Неправильно введен email или username'
             )
+        user.set_confirmation_code(validated_data['confirmation_code'])
+        user.save(
+            update_fields=('confirmation_code', 'confirmation_code_expires')
+        )
         return user
 
 
@@ -44,7 +108,9 @@ class TokenSerializer(serializers.Serializer):
         fields = ('username', 'confirmation_code')
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(
+    TimedDataMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     """Сериализатор для модели User."""
 
     class Meta:
@@ -55,6 +121,7 @@ class UserSerializer(serializers.ModelSerializer):
                   'last_name',
                   'bio',
                   'role')
+        list_serializer_class = TimedListSerializer
 
 
 class MeSerializer(UserSerializer):
@@ -65,25 +132,91 @@ class MeSerializer(UserSerializer):
         read_only_fields = ('role',)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedDataMixin, serializers.ModelSerializer):
     """Сериализатор для модели Category."""
 
     class Meta:
         model = Category
         fields = ('name', 'slug')
+        list_serializer_class = TimedListSerializer
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedDataMixin, serializers.ModelSerializer):
     """Сериализатор для модели Genre."""
 
     class Meta:
         model = Genre
         fields = ('name', 'slug')
+        list_serializer_class = TimedListSerializer
+
+
+class LookupField(serializers.Field):
+    """Вложенный справочник по id из процессного кэша, без JOIN."""
+
+    def __init__(self, lookup, **kwargs):
+        self.lookup = lookup
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        entry = self.lookup.get_entry(value)
+        if entry is None:
+            return None
+        name, slug = entry
+        return {'name': name, 'slug': slug}
+
+
+class LookupManyRelatedField(serializers.ManyRelatedField):
+    """Список слагов: недостающие в кэше ищутся одним запросом."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child_relation.lookup.warm(
+                [slug for slug in data if isinstance(slug, str)]
+            )
+        return super().to_internal_value(data)
+
+
+class LookupSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который ищет id по слагу в процессном кэше."""
+
+    def __init__(self, lookup=None, **kwargs):
+        self.lookup = lookup
+        super().__init__(**kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return LookupManyRelatedField(**list_kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        pk = self.lookup.get_id(data)
+        if pk is None:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field, value=data
+            )
+        return self.get_queryset().model(pk=pk, **{self.slug_field: data})
+
+    def to_representation(self, obj):
+        entry = self.lookup.get_entry(obj.pk)
+        if entry is None:
+            return None
+        return entry[1]
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(
+    TimedDataMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     """Сериализатор для модели Title(чтения)."""
-    category = CategorySerializer(read_only=True)
+    category = LookupField(lookups.categories, source='category_id')
     genre = GenreSerializer(many=True, read_only=True)
     rating = serializers.IntegerField(read_only=True)
 
@@ -96,15 +229,39 @@ class TitleSerializer(serializers.ModelSerializer):
                   'description',
                   'category',
                   'genre')
+        sparse_columns = {'genre': ()}
+        sparse_prefetch_related = {'genre': 'genre'}
+        list_serializer_class = TimedListSerializer
+
+
+class TitleDetailSerializer(TitleSerializer):
+    """Сериализатор для модели Title(чтение с распределением оценок)."""
+    scores = serializers.DictField(
+        source='score_distribution',
+        child=serializers.IntegerField(),
+        read_only=True
+    )
 
+    class Meta(TitleSerializer.Meta):
+        fields = TitleSerializer.Meta.fields + ('scores',)
+        sparse_columns = {
+            **TitleSerializer.Meta.sparse_columns,
+            'scores': tuple(f'score_{score}' for score in SCORES),
+        }
 
-class TitleWriteSerializer(serializers.ModelSerializer):
+
+class TitleWriteSerializer(TimedDataMixin, serializers.ModelSerializer):
     """Сериализатор для модели Title(запись)."""
-    category = serializers.SlugRelatedField(
-        slug_field='slug', queryset=Category.objects.all()
+    category = LookupSlugRelatedField(
+        lookup=lookups.categories,
+        slug_field='slug',
+        queryset=Category.objects.all()
     )
-    genre = serializers.SlugRelatedField(
-        slug_field='slug', queryset=Genre.objects.all(), many=True
+    genre = LookupSlugRelatedField(
+        lookup=lookups.genres,
+        slug_field='slug',
+        queryset=Genre.objects.all(),
+        many=True
     )
 
     class Meta:
@@ -112,7 +269,9 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'year', 'description', 'category', 'genre')
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(
+    TimedDataMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     """Сериализатор для модели Review."""
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
@@ -121,9 +280,14 @@ class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
+        sparse_columns = {'author': ('author__username',)}
+        sparse_select_related = {'author': 'author'}
+        list_serializer_class = TimedListSerializer
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(
+    TimedDataMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     """Сериализатор для модели Comment."""
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
@@ -132,3 +296,22 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+        sparse_columns = {'author': ('author__username',)}
+        sparse_select_related = {'author': 'author'}
+        list_serializer_class = TimedListSerializer
+
+
+class ChangeLogEntrySerializer(
+    TimedDataMixin, serializers.ModelSerializer
+):
+    """Сериализатор записи журнала изменений."""
+    title = serializers.IntegerField(source='title_id')
+    review = serializers.IntegerField(source='review_id')
+
+    class Meta:
+        model = ChangeLogEntry
+        fields = (
+            'sequence', 'model', 'action', 'object_id', 'title', 'review',
+            'data', 'created_at'
+        )
+        list_serializer_class = TimedListSerializer
@@ -0,0 +1,184 @@
+"""
+Журнал медленных SQL-запросов.
+
+Middleware замеряет каждый запрос к базе. Запросы дольше
+`SLOW_QUERY_THRESHOLD_MS` сводятся по нормализованному тексту
+(литералы и списки IN заменены заполнителями): число, суммарное
+и наибольшее время. Сводка по убыванию суммарного времени отдается
+администратору на /api/v1/slow-queries/.
+
+В лог api.slow_queries пишется первый медленный запрос каждой формы
+и дальше доля `SLOW_QUERY_SAMPLE_RATE` остальных: представление,
+действие и поле сериализатора, которые его вызвали, и верхние кадры
+стека из кода api/ и reviews/. Стек разбирается только для записей,
+попавших в лог.
+"""
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.views import APIView
+
+from . import query_hooks
+from .middleware import AsyncCapableMiddleware
+from .nplusone import serializer_field
+
+logger = logging.getLogger(__name__)
+
+APP_DIRS = tuple(
+    os.path.join(str(settings.BASE_DIR), app) + os.sep
+    for app in ('api', 'reviews')
+)
+# Модули, через которые проходит каждый запрос к базе.
+INTERNAL_FILES = (__file__, query_hooks.__file__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)', re.IGNORECASE)
+_VALUES = re.compile(r'\((?:%s, )*%s\)(?:, \((?:%s, )*%s\))+')
+_SPACE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """Форма запроса: без литералов, длины списков IN и числа строк."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _VALUES.sub('(...), ...', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class SlowQueryStats:
+    """Сводка медленных запросов по формам в памяти процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.statements = {}
+        self.dropped = 0
+
+    def observe(self, statement, milliseconds):
+        """Учитывает запрос; True — такая форма встретилась впервые."""
+        with self.lock:
+            stats = self.statements.get(statement)
+            if stats is None:
+                if len(self.statements) >= settings.SLOW_QUERY_MAX_STATEMENTS:
+                    self.dropped += 1
+                    return False
+                stats = self.statements[statement] = {
+                    'count': 0, 'total_ms': 0.0, 'max_ms': 0.0
+                }
+            stats['count'] += 1
+            stats['total_ms'] += milliseconds
+            stats['max_ms'] = max(stats['max_ms'], milliseconds)
+            return stats['count'] == 1
+
+    def top(self, limit=None):
+        """Формы по убыванию суммарного времени."""
+        with self.lock:
+            rows = [
+                {
+                    'sql': statement,
+                    'count': stats['count'],
+                    'total_ms': round(stats['total_ms'], 3),
+                    'max_ms': round(stats['max_ms'], 3),
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 3),
+                }
+                for statement, stats in self.statements.items()
+            ]
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows[:limit]
+
+    def clear(self):
+        with self.lock:
+            self.statements.clear()
+            self.dropped = 0
+
+
+stats = SlowQueryStats()
+
+
+def _origin(frame):
+    """Представление DRF, его действие и кадры кода приложения."""
+    view = action = None
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        if view is None:
+            owner = frame.f_locals.get('self')
+            if isinstance(owner, APIView):
+                view = type(owner).__name__
+                action = getattr(owner, 'action', None)
+        # __call__ — это middleware и обертки запросов, а не код,
+        # который выполняет запрос.
+        if (
+            len(frames) < settings.SLOW_QUERY_STACK_DEPTH
+            and code.co_filename.startswith(APP_DIRS)
+            and code.co_name != '__call__'
+            and code.co_filename not in INTERNAL_FILES
+        ):
+            path = os.path.relpath(code.co_filename, settings.BASE_DIR)
+            frames.append(f'{path}:{frame.f_lineno} in {code.co_name}')
+        frame = frame.f_back
+    return view, action, frames
+
+
+class SlowQueryLog:
+    """execute_wrapper, замеряющий запросы одного запроса к API."""
+
+    def __init__(self, request):
+        self.request = request
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            milliseconds = (time.perf_counter() - started) * 1000
+            if milliseconds >= settings.SLOW_QUERY_THRESHOLD_MS:
+                self.observe(sql, params, many, milliseconds)
+
+    def observe(self, sql, params, many, milliseconds):
+        statement = normalize(sql)
+        first = stats.observe(statement, milliseconds)
+        if not first and random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+            return
+        frame = sys._getframe(2)
+        view, action, frames = _origin(frame)
+        field = serializer_field(frame)
+        match = self.request.resolver_match
+        entry = {
+            'sql': statement,
+            'params': len(params[0] if many and params else params or ()),
+            'ms': round(milliseconds, 3),
+            'path': self.request.path,
+            'view': view or (match.view_name if match else None),
+            'action': action,
+            'serializer_field': field[0] if field else None,
+            'relation': field[1] if field else None,
+            'stack': frames,
+        }
+        logger.warning(json.dumps(entry, ensure_ascii=False))
+
+
+class SlowQueryMiddleware(AsyncCapableMiddleware):
+    """Пишет медленные SQL-запросы, см. модуль."""
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def call(self, request):
+        with query_hooks.query_hook(SlowQueryLog(request)):
+            return self.get_response(request)
+
+    async def acall(self, request):
+        with query_hooks.query_hook(SlowQueryLog(request)):
+            return await self.get_response(request)
@@ -0,0 +1,107 @@
+import hashlib
+import time
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Ограничение частоты запросов по алгоритму token bucket.
+    В кеше хранится только пара (токены, время обновления),
+    поэтому проверка занимает O(1) вне зависимости от частоты.
+    Скорость задается в `DEFAULT_THROTTLE_RATES` по `scope`.
+    """
+    cache_format = 'throttle_bucket_%(scope)s_%(ident)s'
+    # Чтение и запись корзины идут под блокировкой из cache.add,
+    # иначе одновременные запросы потратили бы один и тот же токен.
+    lock_timeout = 1
+    lock_attempts = 50
+    lock_delay = 0.002
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        lock_key = f'{self.key}_lock'
+        if not self.acquire(lock_key):
+            # Корзину держат одновременные запросы того же клиента.
+            self.tokens = 0
+            return self.throttle_failure()
+        try:
+            self.now = self.timer()
+            tokens, updated = self.cache.get(
+                self.key, (self.num_requests, self.now)
+            )
+            self.tokens = min(
+                self.num_requests,
+                tokens
+                + (self.now - updated) * self.num_requests / self.duration
+            )
+            if self.tokens < 1:
+                return self.throttle_failure()
+            self.cache.set(
+                self.key, (self.tokens - 1, self.now), self.duration
+            )
+            return self.throttle_success()
+        finally:
+            self.cache.delete(lock_key)
+
+    def acquire(self, lock_key):
+        for _ in range(self.lock_attempts):
+            if self.cache.add(lock_key, 1, self.lock_timeout):
+                return True
+            time.sleep(self.lock_delay)
+        return False
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Корзина токенов на IP-адрес клиента."""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """
+    Корзина токенов на `username` из тела запроса. Имя еще
+    не проверено, поэтому в ключ кеша идет его хеш: пробелы,
+    управляющие символы и длинные строки недопустимы в memcached.
+    """
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': hashlib.sha256(
+                username.lower().encode()
+            ).hexdigest(),
+        }
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignupUsernameThrottle(UsernameThrottle):
+    scope = 'signup_username'
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(UsernameThrottle):
+    scope = 'token_username'
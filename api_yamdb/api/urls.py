@@ -1,8 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       RegisterView, ReviewViewSet, TitleViewSet, TokenView,
+from api import async_views
+from api.views import (CategoryViewSet, ChangeFeedView, CommentViewSet,
+                       GenreViewSet, MetricsView, ProfileView, RegisterView,
+                       ReviewViewSet, SlowQueryView, TitleViewSet, TokenView,
                        UserViewSet)
 
 
@@ -24,7 +26,34 @@ auth_patterns = [
     path('token/', TokenView.as_view()),
 ]
 
+async_patterns = [
+    path('titles/', async_views.title_list),
+    path('titles/<int:title_id>/', async_views.title_detail),
+    path('titles/<int:title_id>/reviews/', async_views.review_list),
+    path(
+        'titles/<int:title_id>/reviews/<int:review_id>/',
+        async_views.review_detail
+    ),
+    path(
+        'titles/<int:title_id>/reviews/<int:review_id>/comments/',
+        async_views.comment_list
+    ),
+    path(
+        'titles/<int:title_id>/reviews/<int:review_id>/comments/'
+        '<int:comment_id>/',
+        async_views.comment_detail
+    ),
+]
+
 urlpatterns = [
     path('v1/auth/', include(auth_patterns)),
+    path('v1/async/', include(async_patterns)),
+    path('v1/metrics/', MetricsView.as_view()),
+    path('v1/changes/', ChangeFeedView.as_view()),
+    path('v1/slow-queries/', SlowQueryView.as_view()),
+    path(
+        'v1/profiles/<str:profile_id>/', ProfileView.as_view(),
+        name='profile'
+    ),
     path('v1/', include((router_v1.urls))),
 ]
@@ -3,32 +3,44 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.utils.urls import replace_query_param
+from rest_framework_simplejwt.tokens import AccessToken
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils.crypto import get_random_string
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 from django.core.mail import send_mail
-from django.db.models import Avg
+from django.http import Http404, HttpResponse
 
+from reviews import changelog, leaderboards, lookups, purge, ratings
 from reviews.models import Category, Genre, Review, Title
-from .filters import TitleFilter
+from . import expand, profiling, slow_queries
+from .filters import TitleFilter, TitleOrderingFilter, title_ordering
+from .metrics import registry
 from .mixins import (
-    ListCreateDestroyMixin, RetrieveListCreatePartialUpdateDestroyMixin
+    BatchRetrieveMixin, ListCreateDestroyMixin,
+    RetrieveListCreatePartialUpdateDestroyMixin, SparseFieldsQuerysetMixin
 )
 from .premissions import (
     IsAdmin, ReadOnly, IsAuthorOrAdminOrModeratorOrReadOnly
 )
 from .serializers import (
-    CategorySerializer, CommentSerializer, GenreSerializer,
-    RegisterDataSerializer, ReviewSerializer, TitleSerializer,
-    TitleWriteSerializer, TokenSerializer, UserSerializer, MeSerializer
+    CategorySerializer, ChangeLogEntrySerializer, CommentSerializer,
+    GenreSerializer, RegisterDataSerializer, ReviewSerializer,
+    TitleDetailSerializer, TitleSerializer, TitleWriteSerializer,
+    TokenSerializer, UserSerializer, MeSerializer
+)
+from .throttling import (
+    SignupIPThrottle, SignupUsernameThrottle, TokenIPThrottle,
+    TokenUsernameThrottle
 )
 
 User = get_user_model()
 
 
 class RegisterView(views.APIView):
+    throttle_classes = (SignupIPThrottle, SignupUsernameThrottle)
 
     def post(self, request):
         serializer = RegisterDataSerializer(data=request.data)
@@ -45,21 +57,107 @@ class RegisterView(views.APIView):
 
 
 class TokenView(views.APIView):
+    throttle_classes = (TokenIPThrottle, TokenUsernameThrottle)
 
     def post(self, request):
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data['username']
         confirmation_code = serializer.validated_data['confirmation_code']
-        user = get_object_or_404(User, username=username)
-        if confirmation_code == user.confirmation_code:
-            token = RefreshToken.for_user(user)
-            return Response({'token': token}, status=status.HTTP_201_CREATED)
+        user = get_object_or_404(
+            User.objects.alive().only(
+                'id', 'username', 'confirmation_code',
+                'confirmation_code_expires'
+            ),
+            username=username
+        )
+        if user.check_confirmation_code(confirmation_code):
+            User.objects.filter(pk=user.pk).update(
+                confirmation_code=None, confirmation_code_expires=None
+            )
+            token = AccessToken.for_user(user)
+            return Response({'token': str(token)}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(RetrieveListCreatePartialUpdateDestroyMixin):
-    queryset = User.objects.all()
+class MetricsView(views.APIView):
+    """Метрики запросов в текстовом формате Prometheus."""
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return HttpResponse(
+            registry.to_prometheus(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+
+class SlowQueryView(views.APIView):
+    """
+    Медленные SQL-запросы процесса по убыванию суммарного времени:
+    ?limit=<n>, см. api.slow_queries.
+    """
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', 50))
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        return Response({
+            'statements': slow_queries.stats.top(max(1, limit)),
+            'dropped': slow_queries.stats.dropped,
+        })
+
+
+class ProfileView(views.APIView):
+    """Отчет профилировщика запроса, см. api.profiling."""
+    permission_classes = (IsAdmin,)
+
+    def get(self, request, profile_id):
+        report = profiling.get_report(profile_id)
+        if report is None:
+            raise Http404
+        return Response(report)
+
+
+class ChangeFeedView(views.APIView):
+    """
+    Лента изменений для инкрементальной синхронизации:
+    ?since=<номер>&limit=<n>&title=<id>. Отдает записи с номером
+    больше since по возрастанию; следующую страницу зеркало запрашивает
+    с since=next_since, см. reviews.changelog.
+    """
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            since = int(params.get('since', 0))
+            limit = int(params.get('limit', settings.CHANGELOG_PAGE_SIZE))
+            title_id = int(params['title']) if 'title' in params else None
+        except ValueError:
+            raise ValidationError(
+                {'detail': 'since, limit и title — целые числа.'}
+            )
+        limit = max(1, min(limit, settings.CHANGELOG_MAX_PAGE_SIZE))
+        entries = changelog.feed(since, limit, title_id)
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        next_since = entries[-1].sequence if entries else since
+        return Response({
+            'results': ChangeLogEntrySerializer(entries, many=True).data,
+            'next_since': next_since,
+            'has_more': has_more,
+            'next': replace_query_param(
+                request.build_absolute_uri(), 'since', next_since
+            ),
+        })
+
+
+class UserViewSet(
+    SparseFieldsQuerysetMixin, RetrieveListCreatePartialUpdateDestroyMixin
+):
+    queryset = User.objects.alive()
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
     filter_backends = (filters.SearchFilter,)
@@ -80,6 +178,13 @@ class UserViewSet(RetrieveListCreatePartialUpdateDestroyMixin):
             serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def perform_destroy(self, instance):
+        if purge.should_defer(User, instance.pk):
+            purge.mark_deleted(instance)
+            return
+        with changelog.atomic():
+            purge.delete_now(User, [instance.pk])
+
 
 class CategoryViewSet(ListCreateDestroyMixin):
     queryset = Category.objects.all()
@@ -88,6 +193,7 @@ class CategoryViewSet(ListCreateDestroyMixin):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    use_read_replica = True
 
 
 class GenreViewSet(ListCreateDestroyMixin):
@@ -97,54 +203,189 @@ class GenreViewSet(ListCreateDestroyMixin):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    use_read_replica = True
 
 
-class TitleViewSet(RetrieveListCreatePartialUpdateDestroyMixin):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).order_by('-rating')
+class TitleViewSet(
+    BatchRetrieveMixin, SparseFieldsQuerysetMixin,
+    RetrieveListCreatePartialUpdateDestroyMixin
+):
+    queryset = Title.objects.alive().prefetch_related('genre').order_by(
+        *title_ordering(('-rating',))
+    )
     permission_classes = [ReadOnly | IsAdmin]
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = ('rating', 'year', 'name', 'reviews_count', 'id')
+    ordering = ('-rating',)
+    use_read_replica = True
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action == 'retrieve':
+            return TitleDetailSerializer
+        if self.action in ('list', 'top', 'batch'):
             return TitleSerializer
         return TitleWriteSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Произведение; с ?expand=reviews,reviews.comments — вместе
+        с последними отзывами и комментариями к ним, см. api.expand.
+        """
+        limits = expand.parse(request)
+        title = self.get_object()
+        data = self.get_serializer(title).data
+        if limits:
+            data = expand.embed(
+                data, title, limits, ReviewSerializer, CommentSerializer
+            )
+        return Response(data)
+
+    def perform_create(self, serializer):
+        with changelog.atomic():
+            title = serializer.save()
+            changelog.record(changelog.CREATE, title, serializer.data)
+            leaderboards.refresh_title(title.id)
+
+    def perform_update(self, serializer):
+        with changelog.atomic():
+            title = serializer.save()
+            changelog.record(changelog.UPDATE, title, serializer.data)
+            leaderboards.refresh_title(title.id)
+
+    def perform_destroy(self, instance):
+        with changelog.atomic():
+            changelog.record(changelog.DELETE, instance)
+            if purge.should_defer(Title, instance.pk):
+                purge.mark_deleted(instance)
+                leaderboards.refresh_title(instance.pk)
+            else:
+                instance.delete()
+
+    @action(detail=False, url_path='top')
+    def top(self, request):
+        """
+        Топ-k произведений из предрасчитанного рейтинга:
+        ?by=rating|trending&category=<slug>&genre=<slug>&limit=<k>.
+        Рейтинги считаются по категории или по жанру, но не по обоим.
+        """
+        params = request.query_params
+        if 'category' in params and 'genre' in params:
+            raise ValidationError(
+                {'detail': 'Укажите либо category, либо genre.'}
+            )
+        metric = params.get('by', leaderboards.RATING)
+        if metric not in leaderboards.METRICS:
+            raise ValidationError(
+                {'by': f'Допустимые значения: {leaderboards.METRICS}.'}
+            )
+        try:
+            limit = int(params.get('limit', settings.LEADERBOARD_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        limit = max(1, min(limit, settings.LEADERBOARD_MAX_LIMIT))
+        category_id = genre_id = None
+        if 'category' in params:
+            category_id = lookups.categories.get_id(params['category'])
+            if category_id is None:
+                raise Http404
+        elif 'genre' in params:
+            genre_id = lookups.genres.get_id(params['genre'])
+            if genre_id is None:
+                raise Http404
+        ranking = leaderboards.top(metric, limit, category_id, genre_id)
+        titles = self.get_queryset().in_bulk(
+            [title_id for title_id, _ in ranking]
+        )
+        data = self.get_serializer(
+            [titles[title_id] for title_id, _ in ranking], many=True
+        ).data
+        for item, (_, score) in zip(data, ranking):
+            item['score'] = score
+        return Response(data)
+
 
-class ReviewViewSet(RetrieveListCreatePartialUpdateDestroyMixin):
+class ReviewViewSet(
+    BatchRetrieveMixin, SparseFieldsQuerysetMixin,
+    RetrieveListCreatePartialUpdateDestroyMixin
+):
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthorOrAdminOrModeratorOrReadOnly]
+    use_read_replica = True
 
     def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs['title_id'])
+        return get_object_or_404(
+            Title.objects.alive(), pk=self.kwargs['title_id']
+        )
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.alive().select_related('author')
 
     def perform_create(self, serializer):
         title = self.get_title()
         author = self.request.user
-        if Review.objects.filter(author=author, title=title).exists():
+        if Review.objects.alive().filter(author=author, title=title).exists():
             raise ValidationError(
                 'Вы уже оставляли отзыв на это произведение.')
-        serializer.save(author=author, title=title)
+        with changelog.atomic():
+            review = serializer.save(author=author, title=title)
+            ratings.update_histogram(title.id, added=review.score)
+            leaderboards.refresh_scores(title.id, added=[review.pub_date])
+            changelog.record(changelog.CREATE, review, serializer.data)
 
+    def perform_update(self, serializer):
+        old_score = serializer.instance.score
+        with changelog.atomic():
+            review = serializer.save()
+            ratings.update_histogram(
+                review.title_id, added=review.score, removed=old_score
+            )
+            leaderboards.refresh_scores(review.title_id)
+            changelog.record(changelog.UPDATE, review, serializer.data)
 
-class CommentViewSet(RetrieveListCreatePartialUpdateDestroyMixin):
+    def perform_destroy(self, instance):
+        with changelog.atomic():
+            changelog.record(changelog.DELETE, instance)
+            if purge.should_defer(Review, instance.pk):
+                purge.mark_deleted(instance)
+            else:
+                instance.delete()
+            ratings.update_histogram(instance.title_id, removed=instance.score)
+            leaderboards.refresh_scores(
+                instance.title_id, removed=[instance.pub_date]
+            )
+
+
+class CommentViewSet(
+    SparseFieldsQuerysetMixin, RetrieveListCreatePartialUpdateDestroyMixin
+):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthorOrAdminOrModeratorOrReadOnly]
+    use_read_replica = True
 
     def get_review(self):
         return get_object_or_404(
-            Review,
+            Review.objects.alive().filter(title__deleted_at__isnull=True),
             pk=self.kwargs['review_id'],
             title_id=self.kwargs['title_id']
         )
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        with changelog.atomic():
+            comment = serializer.save(
+                author=self.request.user, review=self.get_review()
+            )
+            changelog.record(changelog.CREATE, comment, serializer.data)
+
+    def perform_update(self, serializer):
+        with changelog.atomic():
+            comment = serializer.save()
+            changelog.record(changelog.UPDATE, comment, serializer.data)
+
+    def perform_destroy(self, instance):
+        with changelog.atomic():
+            changelog.record(changelog.DELETE, instance)
+            instance.delete()
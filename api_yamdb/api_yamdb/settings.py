@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -26,6 +27,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -33,6 +36,10 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.profiling.ProfilerMiddleware',
+    'api.nplusone.NPlusOneMiddleware',
+    'api.slow_queries.SlowQueryMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -60,9 +67,23 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.metrics.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS':
     'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': '20/hour',
+        'signup_username': '5/hour',
+        'token_ip': '30/min',
+        'token_username': '5/min',
+    },
+    # Число доверенных прокси перед приложением. При 0 ограничение
+    # по IP берет REMOTE_ADDR и не верит X-Forwarded-For клиента;
+    # за балансировщиком задается NUM_PROXIES=1.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
 DATABASES = {
@@ -72,6 +93,43 @@ DATABASES = {
     }
 }
 
+# Для локальной проверки реплики: REPLICA_DB_NAME=db_replica.sqlite3
+if os.getenv('REPLICA_DB_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / os.getenv('REPLICA_DB_NAME'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
+# Сколько секунд после записи читать данные пользователя с основной базы.
+REPLICA_PIN_SECONDS = 5
+
+# Кэш должен быть общим для всех процессов: в нем лежат корзины
+# троттлинга, закрепления за основной базой после записи, версии
+# справочников (reviews.lookups) и отчеты профилировщика. С кэшем
+# в памяти процесса каждый воркер видит только свои записи.
+# CACHE_BACKEND=database (по умолчанию) — таблица в основной базе,
+# создается командой `manage.py createcachetable`;
+# CACHE_BACKEND=memcached — серверы из CACHE_LOCATION через клиент
+# pymemcache (requirements-memcached.txt);
+# CACHE_BACKEND=locmem — только для разработки в одном процессе.
+CACHE_BACKENDS = {
+    'database': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'yamdb_cache',
+    },
+    'memcached': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', '127.0.0.1:11211').split(','),
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+CACHES = {'default': CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'database')]}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -104,6 +162,83 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
+# Сжатие ответов API: префиксы путей, минимальный размер тела в байтах
+# и уровни сжатия по кодировкам.
+COMPRESSION_PATH_PREFIXES = ('/api/',)
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+
+# Исходная спецификация ReDoc и каталог, куда `build_redoc` кладет
+# ее JSON-версию со сжатыми вариантами.
+REDOC_SOURCE = BASE_DIR / 'static' / 'redoc.yaml'
+REDOC_BUILD_DIR = BASE_DIR / 'redoc_build'
+
+# Гистограммы запросов по эндпоинтам, отдаются на /api/v1/metrics/.
+METRICS_ENABLED = True
+
+# Профилирование запросов администратора по заголовку X-Profile или
+# параметру ?profile: число функций и SQL-запросов в отчете и срок
+# хранения отчета в кэше, в секундах.
+PROFILER_ENABLED = True
+PROFILER_TOP_FUNCTIONS = 30
+PROFILER_MAX_QUERIES = 200
+PROFILER_TTL = 3600
+
+# Поиск N+1 запросов (api.nplusone) в запросах к путям из
+# NPLUSONE_PATH_PREFIXES: больше NPLUSONE_LAZY_LOAD_THRESHOLD ленивых
+# загрузок одной связи из полей сериализаторов или больше
+# NPLUSONE_REPEAT_THRESHOLD одинаковых SQL-запросов пишутся в лог,
+# а при NPLUSONE_RAISE — выбрасывают исключение.
+NPLUSONE_ENABLED = DEBUG
+NPLUSONE_RAISE = False
+NPLUSONE_PATH_PREFIXES = ('/api/',)
+NPLUSONE_LAZY_LOAD_THRESHOLD = 2
+NPLUSONE_REPEAT_THRESHOLD = 2
+
+# Журнал медленных SQL-запросов (api.slow_queries): порог в мс,
+# доля повторных медленных запросов одной формы, попадающих в лог,
+# число кадров стека приложения в записи и предел числа форм в сводке.
+SLOW_QUERY_LOG_ENABLED = True
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_SAMPLE_RATE = 0.1
+SLOW_QUERY_STACK_DEPTH = 5
+SLOW_QUERY_MAX_STATEMENTS = 500
+
+# Предрасчитанные рейтинги: размер выдачи и период полураспада
+# вклада отзыва в популярность.
+LEADERBOARD_LIMIT = 10
+LEADERBOARD_MAX_LIMIT = 100
+TRENDING_HALF_LIFE = timedelta(days=7)
+
+# Встраивание в ответ произведения (?expand=reviews,reviews.comments):
+# число отзывов и комментариев к каждому по умолчанию и наибольшее.
+EXPAND_REVIEWS_LIMIT = 10
+EXPAND_COMMENTS_LIMIT = 3
+EXPAND_MAX_LIMIT = 50
+
+# Наибольшее число id в одном запросе .../batch/.
+BATCH_MAX_IDS = 500
+
+# Размер процессного кэша справочников категорий и жанров и период
+# сверки его версии с общим кэшем, в секундах.
+LOOKUP_CACHE_SIZE = 1024
+LOOKUP_CACHE_SYNC_INTERVAL = 1
+
+CONFIRMATION_CODE_LIFETIME = timedelta(hours=24)
+
+# Произведения, отзывы и пользователи, у которых больше отзывов
+# и комментариев, чем DEFERRED_DELETE_THRESHOLD, удаляются в фоне
+# командой purge_deleted порциями по PURGE_BATCH_SIZE строк;
+# в режиме --loop очередь проверяется раз в PURGE_INTERVAL секунд.
+DEFERRED_DELETE_THRESHOLD = 1000
+PURGE_BATCH_SIZE = 1000
+PURGE_INTERVAL = 5
+
+# Лента изменений /api/v1/changes/: размер страницы по умолчанию
+# и наибольший.
+CHANGELOG_PAGE_SIZE = 100
+CHANGELOG_MAX_PAGE_SIZE = 1000
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
@@ -1,13 +1,13 @@
 from django.contrib import admin
 from django.urls import include, path
-from django.views.generic import TemplateView
+
+from api import redoc
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    path('redoc/', redoc.redoc_page, name='redoc'),
     path(
-        'redoc/',
-        TemplateView.as_view(template_name='redoc.html'),
-        name='redoc'
+        'redoc/<str:digest>.json', redoc.redoc_spec, name='redoc-spec'
     ),
 ]
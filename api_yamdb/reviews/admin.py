@@ -1,7 +1,116 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.utils import get_fields_from_path
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils.functional import cached_property
 
+from . import changelog, leaderboards, purge, ratings
 from .models import Category, Genre, Title, Review, Comment
 
+User = get_user_model()
+
+# Ниже этого числа строк оценка из статистики не точнее COUNT(*)
+# и почти не быстрее.
+ESTIMATE_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор, который для списка без фильтров берет число строк
+    из статистики PostgreSQL вместо COUNT(*) по всей таблице.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class '
+                    'WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= ESTIMATE_THRESHOLD:
+                return row[0]
+        return super().count
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Фильтр по внешнему ключу с полем автодополнения вместо списка
+    всех связанных объектов. Варианты ищутся через search_fields
+    админки связанной модели.
+    """
+    template = 'admin/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin,
+                 field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        self.lookup_val = params.get(self.lookup_kwarg) or None
+        super().__init__(
+            field, request, params, model, model_admin, field_path
+        )
+        form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+        self.widget = form_field.widget.render(
+            self.lookup_kwarg, self.lookup_val,
+            attrs={'onchange': 'this.form.submit()'}
+        )
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.lookup_val is None:
+            return queryset
+        return queryset.filter(**{self.lookup_kwarg: self.lookup_val})
+
+    def choices(self, changelist):
+        self.hidden_params = [
+            (name, value) for name, value in changelist.params.items()
+            if name not in (self.lookup_kwarg, PAGE_VAR)
+        ]
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': changelist.get_query_string(
+                remove=[self.lookup_kwarg]
+            ),
+            'display': 'Все',
+        }
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    """
+    Админка больших таблиц: без полного COUNT(*), с оценкой числа
+    строк и фильтрами с автодополнением.
+    """
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    @property
+    def media(self):
+        media = super().media
+        for list_filter in self.list_filter:
+            if isinstance(list_filter, tuple) and issubclass(
+                list_filter[1], AutocompleteFilter
+            ):
+                field = get_fields_from_path(self.model, list_filter[0])[-1]
+                media += AutocompleteSelect(field, self.admin_site).media
+        return media
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -20,19 +129,94 @@ class GenreAdmin(admin.ModelAdmin):
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
     list_display = ('name', 'year', 'category', 'description')
-    search_fields = ('name', 'description', 'category__name', 'genre__name')
+    # Поиск по началу названия, а не по подстроке в описании и жанрах:
+    # им пользуется автодополнение в фильтрах отзывов. На PostgreSQL
+    # его обслуживает индекс title_name_prefix_idx (миграция 0008).
+    search_fields = ('^name',)
     list_filter = ('category', 'genre')
+    list_select_related = ('category',)
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(ScalableAdmin):
     list_display = ('author', 'title', 'text', 'score', 'pub_date')
-    search_fields = ('author__username', 'title__name', 'text')
-    list_filter = ('author', 'title', 'pub_date')
+    list_select_related = ('author', 'title')
+    # Поиск: id отзыва, точное имя автора или начало названия
+    # произведения, см. get_search_results.
+    search_fields = ('=author__username', '^title__name')
+    list_filter = (
+        ('author', AutocompleteFilter),
+        ('title', AutocompleteFilter),
+        'pub_date',
+    )
+    autocomplete_fields = ('author', 'title')
+
+    def get_queryset(self, request):
+        # Автодополнение отзывов в админке комментариев выводит
+        # str(review), которому нужны произведение и автор.
+        return super().get_queryset(request).select_related(
+            'author', 'title'
+        )
+
+    def get_readonly_fields(self, request, obj=None):
+        # Оценка и произведение учтены в гистограмме рейтинга;
+        # у существующего отзыва их меняют через API.
+        if obj is not None:
+            return ('title', 'score')
+        return ()
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if not change:
+                ratings.update_histogram(obj.title_id, added=obj.score)
+                leaderboards.refresh_scores(
+                    obj.title_id, added=[obj.pub_date]
+                )
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Review.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        with changelog.atomic():
+            purge.delete_now(Review, queryset.values('id'))
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            return queryset.filter(pk=term), False
+        return queryset.filter(
+            Q(author_id__in=User.objects.filter(
+                username=term
+            ).values('id'))
+            | Q(title_id__in=Title.objects.filter(
+                name__istartswith=term
+            ).values('id'))
+        ), False
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ScalableAdmin):
     list_display = ('author', 'review', 'text', 'pub_date')
-    search_fields = ('author__username', 'review__title__name', 'text')
-    list_filter = ('author', 'review', 'pub_date')
+    list_select_related = ('author', 'review__author', 'review__title')
+    # Поиск: id комментария или отзыва либо точное имя автора,
+    # см. get_search_results.
+    search_fields = ('=author__username',)
+    list_filter = (
+        ('author', AutocompleteFilter),
+        ('review', AutocompleteFilter),
+        'pub_date',
+    )
+    autocomplete_fields = ('author', 'review')
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            return queryset.filter(Q(pk=term) | Q(review_id=term)), False
+        return queryset.filter(
+            author_id__in=User.objects.filter(username=term).values('id')
+        ), False
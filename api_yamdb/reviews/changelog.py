@@ -0,0 +1,131 @@
+"""
+Журнал изменений произведений, отзывов и комментариев для зеркал.
+
+Записи добавляются в той же транзакции, что и само изменение, и только
+дописываются. Зеркало запоминает номер последней полученной записи
+и запрашивает ленту `since=<номер>`, получая лишь новые изменения.
+
+Удаление произведения или отзыва означает удаление всех его потомков,
+отдельные записи для них не пишутся. Отзывы и комментарии, удаленные
+вместе с пользователем, записываются поштучно.
+
+Записи пишутся только внутри `changelog.atomic()`. Номер (sequence)
+записи получают последним запросом транзакции: она блокирует строку
+ChangeLogCounter до фиксации, поэтому транзакция, завершившаяся позже,
+получает большие номера, а номер, видимый зеркалу, уже не обгонит
+запись из незавершенной транзакции — как бы долго ни шли удаление
+пользователя или порция фонового удаления. Записи без номера (их
+транзакция еще идет) лента не отдает.
+"""
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import F, Max, Min
+
+from .models import ChangeLogCounter, ChangeLogEntry, Comment, Review, Title
+
+COUNTER_ID = 1
+
+CREATE = ChangeLogEntry.CREATE
+UPDATE = ChangeLogEntry.UPDATE
+DELETE = ChangeLogEntry.DELETE
+
+
+@contextmanager
+def atomic():
+    """
+    transaction.atomic() для изменений с записью в журнал: последним
+    запросом транзакции записи получают номера.
+    """
+    with transaction.atomic():
+        yield
+        assign_sequence()
+
+
+def assign_sequence():
+    """
+    Нумерует записи без номера: свои и оставшиеся от транзакций,
+    писавших в журнал вне `atomic()`. Номера идут в порядке id
+    с пропусками, общий порядок задает блокировка счетчика.
+    """
+    pending = ChangeLogEntry.objects.filter(sequence__isnull=True)
+    bounds = pending.aggregate(first=Min('id'), last=Max('id'))
+    if bounds['first'] is None:
+        return
+    counter = ChangeLogCounter.objects.select_for_update().filter(
+        pk=COUNTER_ID
+    ).first()
+    if counter is None:
+        counter = ChangeLogCounter.objects.create(
+            pk=COUNTER_ID,
+            value=ChangeLogEntry.objects.aggregate(
+                last=Max('sequence')
+            )['last'] or 0
+        )
+    offset = counter.value + 1 - bounds['first']
+    # Границы id отсекают записи, зафиксированные после подсчета.
+    pending.filter(id__range=(bounds['first'], bounds['last'])).update(
+        sequence=F('id') + offset
+    )
+    ChangeLogCounter.objects.filter(pk=COUNTER_ID).update(
+        value=bounds['last'] + offset
+    )
+
+
+def _describe(instance):
+    """Модель, id произведения и id отзыва для записи журнала."""
+    if isinstance(instance, Title):
+        return ChangeLogEntry.TITLE, instance.pk, None
+    if isinstance(instance, Review):
+        return ChangeLogEntry.REVIEW, instance.title_id, None
+    return (
+        ChangeLogEntry.COMMENT, instance.review.title_id, instance.review_id
+    )
+
+
+def record(action, instance, data=None):
+    """Пишет в журнал изменение объекта с его представлением в API."""
+    model, title_id, review_id = _describe(instance)
+    ChangeLogEntry.objects.create(
+        model=model, action=action, object_id=instance.pk,
+        title_id=title_id, review_id=review_id, data=data
+    )
+
+
+def record_deletes(model, ids):
+    """
+    Пишет удаление отзывов или комментариев, которые удаляются
+    не через API, а вместе с автором. Потомки уже удаленных
+    произведений и отзывов пропускаются.
+    """
+    if model is Review:
+        rows = Review.objects.filter(
+            pk__in=ids, deleted_at__isnull=True,
+            title__deleted_at__isnull=True
+        ).values_list('id', 'title_id', 'id')
+        name = ChangeLogEntry.REVIEW
+    else:
+        rows = Comment.objects.filter(
+            pk__in=ids, review__deleted_at__isnull=True,
+            review__title__deleted_at__isnull=True
+        ).values_list('id', 'review__title_id', 'review_id')
+        name = ChangeLogEntry.COMMENT
+    ChangeLogEntry.objects.bulk_create(
+        ChangeLogEntry(
+            model=name, action=DELETE, object_id=object_id,
+            title_id=title_id,
+            review_id=review_id if model is Comment else None
+        )
+        for object_id, title_id, review_id in rows
+    )
+
+
+def feed(since, limit, title_id=None):
+    """
+    Записи с номером больше `since` по возрастанию, не больше
+    `limit` + 1 штук: лишняя запись показывает, что есть продолжение.
+    """
+    entries = ChangeLogEntry.objects.filter(sequence__gt=since)
+    if title_id is not None:
+        entries = entries.filter(title_id=title_id)
+    return list(entries.order_by('sequence')[:limit + 1])
@@ -0,0 +1,208 @@
+"""
+Предрасчитанные рейтинги произведений.
+
+Для каждого произведения хранится по строке `LeaderboardEntry` на каждый
+рейтинг, в который оно входит, поэтому топ-k читается индексом
+(board, -score) за O(k). Строки обновляются по одному произведению
+в транзакции записи под блокировкой его строки или целиком командой
+`rebuild_leaderboards`.
+
+Популярность — сумма вкладов отзывов, затухающих с периодом
+полураспада `TRENDING_HALF_LIFE`. Хранится логарифм суммы относительно
+фиксированной эпохи: общий множитель затухания одинаков для всех
+произведений, поэтому порядок не меняется со временем
+и пересчитывать значения по расписанию не нужно. Новый отзыв
+добавляет к логарифму свой вклад (logaddexp), удаленный — вычитает.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Value, When
+
+from .models import LeaderboardEntry, Review, Title
+
+RATING = 'rating'
+TRENDING = 'trending'
+METRICS = (RATING, TRENDING)
+TRENDING_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+# Если вычитаемый вклад почти равен всей сумме (логарифмы ближе этой
+# величины), вычитание теряет точность и популярность пересчитывается
+# по отзывам.
+TRENDING_PRECISION = 1e-6
+
+
+def board_name(metric, category_id=None, genre_id=None):
+    if category_id is not None:
+        return f'{metric}:category:{category_id}'
+    if genre_id is not None:
+        return f'{metric}:genre:{genre_id}'
+    return metric
+
+
+def _exponent(pub_date):
+    """Логарифм вклада отзыва относительно эпохи."""
+    tau = settings.TRENDING_HALF_LIFE.total_seconds() / math.log(2)
+    return (pub_date - TRENDING_EPOCH).total_seconds() / tau
+
+
+def _logaddexp(a, b):
+    peak = max(a, b)
+    return peak + math.log1p(math.exp(-abs(a - b)))
+
+
+def _logsubexp(a, b):
+    """
+    log(exp(a) - exp(b)) или None, если вычитание теряет точность:
+    вклад b составляет почти всю сумму a.
+    """
+    if b - a > -TRENDING_PRECISION:
+        return None
+    return a + math.log1p(-math.exp(b - a))
+
+
+def trending_score(pub_dates):
+    """Логарифм суммы затухающих вкладов (log-sum-exp без переполнения)."""
+    exponents = [_exponent(pub_date) for pub_date in pub_dates]
+    if not exponents:
+        return None
+    peak = max(exponents)
+    return peak + math.log(sum(math.exp(x - peak) for x in exponents))
+
+
+def _entries(title_id, category_id, genre_ids, scores):
+    for metric, score in zip(METRICS, scores):
+        if score is None:
+            continue
+        boards = [board_name(metric)]
+        if category_id is not None:
+            boards.append(board_name(metric, category_id=category_id))
+        boards.extend(
+            board_name(metric, genre_id=genre_id) for genre_id in genre_ids
+        )
+        for board in boards:
+            yield LeaderboardEntry(board=board, title_id=title_id, score=score)
+
+
+def _lock_title(title_id):
+    """
+    Блокирует строку произведения до конца транзакции и читает
+    категорию, рейтинг и сохраненную популярность. Одновременные
+    записи по одному произведению так выполняются по очереди.
+    """
+    title = Title.objects.alive().select_for_update().filter(
+        pk=title_id
+    ).values('category_id', 'rating').first()
+    if title is not None:
+        # Отдельным запросом после блокировки: подзапрос в том же
+        # SELECT ... FOR UPDATE читал бы снимок до ожидания блокировки.
+        title['trending'] = LeaderboardEntry.objects.filter(
+            title_id=title_id, board=TRENDING
+        ).values_list('score', flat=True).first()
+    return title
+
+
+def _replace(title_id, title, trending):
+    LeaderboardEntry.objects.filter(title_id=title_id).delete()
+    if title is None:
+        return
+    genre_ids = Title.genre.through.objects.filter(
+        title_id=title_id
+    ).values_list('genre_id', flat=True)
+    LeaderboardEntry.objects.bulk_create(_entries(
+        title_id, title['category_id'], list(genre_ids),
+        (title['rating'], trending)
+    ))
+
+
+def refresh_title(title_id):
+    """
+    Пересчитывает позиции одного произведения во всех рейтингах после
+    изменения его категории, жанров или удаления. Популярность берется
+    из сохраненной строки. Вызывается в транзакции записи.
+    """
+    with transaction.atomic(savepoint=False):
+        title = _lock_title(title_id)
+        _replace(title_id, title, title and title['trending'])
+
+
+def refresh_scores(title_id, added=(), removed=()):
+    """
+    Обновляет очки произведения после записи отзывов в той же
+    транзакции. `added` и `removed` — даты публикации добавленных
+    и удаленных отзывов: популярность меняется на их вклады без
+    чтения остальных отзывов.
+    """
+    with transaction.atomic(savepoint=False):
+        title = _lock_title(title_id)
+        if title is None:
+            return
+        old = trending = title['trending']
+        for pub_date in added:
+            exponent = _exponent(pub_date)
+            trending = (
+                exponent if trending is None
+                else _logaddexp(trending, exponent)
+            )
+        for pub_date in removed:
+            if trending is None:
+                break
+            trending = _logsubexp(trending, _exponent(pub_date))
+        if title['rating'] is None:
+            trending = None
+        elif trending is None:
+            trending = trending_score(
+                Review.objects.alive().filter(title_id=title_id).values_list(
+                    'pub_date', flat=True
+                )
+            )
+        if (old is None) != (trending is None):
+            # Первый или последний отзыв: меняется набор строк.
+            _replace(title_id, title, trending)
+            return
+        LeaderboardEntry.objects.filter(title_id=title_id).update(
+            score=Case(
+                When(board__startswith=TRENDING, then=Value(trending)),
+                default=Value(title['rating']),
+            )
+        )
+
+
+def rebuild(batch_size=5000):
+    """Полный пересчет всех рейтингов по гистограммам оценок."""
+    genres = defaultdict(list)
+    for title_id, genre_id in Title.genre.through.objects.values_list(
+        'title_id', 'genre_id'
+    ).iterator():
+        genres[title_id].append(genre_id)
+    pub_dates = defaultdict(list)
+    for title_id, pub_date in Review.objects.alive().values_list(
+        'title_id', 'pub_date'
+    ).iterator():
+        pub_dates[title_id].append(pub_date)
+    titles = Title.objects.alive().values_list('id', 'category_id', 'rating')
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        batch = []
+        for title_id, category_id, rating in titles.iterator():
+            batch.extend(_entries(
+                title_id, category_id, genres[title_id],
+                (rating, trending_score(pub_dates.pop(title_id, ())))
+            ))
+            if len(batch) >= batch_size:
+                LeaderboardEntry.objects.bulk_create(batch)
+                batch = []
+        LeaderboardEntry.objects.bulk_create(batch)
+
+
+def top(metric, limit, category_id=None, genre_id=None):
+    """id первых `limit` произведений рейтинга с их очками."""
+    return list(
+        LeaderboardEntry.objects.filter(
+            board=board_name(metric, category_id, genre_id)
+        ).order_by('-score', 'title_id').values_list(
+            'title_id', 'score'
+        )[:limit]
+    )
@@ -0,0 +1,165 @@
+"""
+Процессный LRU-кэш справочников категорий и жанров.
+
+Справочники маленькие и меняются редко, а читаются на каждом запросе
+к произведениям, поэтому пары slug -> id и id -> (name, slug) держатся
+в памяти процесса. Изменения моделей сбрасывают локальный кэш сигналами
+и меняют версию в общем кэше Django; остальные процессы сверяют версию
+не чаще раза в `LOOKUP_CACHE_SYNC_INTERVAL` секунд и сбрасывают свой
+кэш, если она поменялась; для этого кэш Django должен быть общим
+для процессов (CACHE_BACKEND в settings). Массовые `update()`
+сигналов не шлют — после них нужно вызвать `invalidate()` вручную.
+
+После сброса первый промах загружает одним запросом весь справочник
+(не больше `maxsize` записей): иначе холодный список произведений
+делал бы по запросу на каждую категорию и жанр. Следующие промахи,
+например по только что созданной записи, читают одну строку.
+"""
+import time
+import uuid
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Category, Genre
+
+
+class LookupCache:
+    """Ограниченный по размеру кэш slug -> id и id -> (name, slug)."""
+
+    def __init__(self, model, maxsize=None):
+        self.model = model
+        self.maxsize = maxsize or settings.LOOKUP_CACHE_SIZE
+        self.version_key = f'lookup-version:{model._meta.label_lower}'
+        self._ids = OrderedDict()
+        self._entries = OrderedDict()
+        self._loaded = False
+        self._version = None
+        self._synced_at = None
+        self._lock = Lock()
+
+    def __deepcopy__(self, memo):
+        # Поля DRF копируют аргументы для каждого сериализатора,
+        # а кэш должен быть общим на процесс.
+        return self
+
+    def _get(self, store, key):
+        with self._lock:
+            if key not in store:
+                return None
+            store.move_to_end(key)
+            return store[key]
+
+    def _put(self, store, key, value):
+        with self._lock:
+            store[key] = value
+            store.move_to_end(key)
+            while len(store) > self.maxsize:
+                store.popitem(last=False)
+
+    def _sync(self):
+        now = time.monotonic()
+        if (
+            self._synced_at is not None
+            and now - self._synced_at < settings.LOOKUP_CACHE_SYNC_INTERVAL
+        ):
+            return
+        version = cache.get(self.version_key)
+        if version != self._version:
+            self.clear()
+            self._version = version
+        self._synced_at = now
+
+    def _load(self):
+        """Загружает справочник целиком; True, если еще не загружал."""
+        if self._loaded:
+            return False
+        for pk, name, slug in self.model.objects.values_list(
+            'id', 'name', 'slug'
+        )[:self.maxsize]:
+            self._put(self._ids, slug, pk)
+            self._put(self._entries, pk, (name, slug))
+        self._loaded = True
+        return True
+
+    def get_id(self, slug):
+        """id записи по слагу или None, если такой записи нет."""
+        self._sync()
+        pk = self._get(self._ids, slug)
+        if pk is None and self._load():
+            pk = self._get(self._ids, slug)
+        if pk is None:
+            row = self.model.objects.filter(slug=slug).values_list(
+                'id', 'name'
+            ).first()
+            if row is None:
+                return None
+            pk, name = row
+            self._put(self._ids, slug, pk)
+            self._put(self._entries, pk, (name, slug))
+        return pk
+
+    def warm(self, slugs):
+        """Загружает недостающие в кэше слаги одним запросом."""
+        self._sync()
+        self._load()
+        missing = [
+            slug for slug in slugs if self._get(self._ids, slug) is None
+        ]
+        if not missing:
+            return
+        for pk, name, slug in self.model.objects.filter(
+            slug__in=missing
+        ).values_list('id', 'name', 'slug'):
+            self._put(self._ids, slug, pk)
+            self._put(self._entries, pk, (name, slug))
+
+    def get_entry(self, pk):
+        """Пара (name, slug) по id или None, если такой записи нет."""
+        self._sync()
+        entry = self._get(self._entries, pk)
+        if entry is None and self._load():
+            entry = self._get(self._entries, pk)
+        if entry is None:
+            entry = self.model.objects.filter(pk=pk).values_list(
+                'name', 'slug'
+            ).first()
+            if entry is None:
+                return None
+            self._put(self._entries, pk, entry)
+            self._put(self._ids, entry[1], pk)
+        return entry
+
+    def clear(self):
+        """Сбрасывает кэш текущего процесса."""
+        with self._lock:
+            self._ids.clear()
+            self._entries.clear()
+            self._loaded = False
+
+    def invalidate(self):
+        """Сбрасывает кэш во всех процессах."""
+        self._version = uuid.uuid4().hex
+        cache.set(self.version_key, self._version, None)
+        self._synced_at = time.monotonic()
+        self.clear()
+
+
+categories = LookupCache(Category)
+genres = LookupCache(Genre)
+LOOKUPS = {Category: categories, Genre: genres}
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def invalidate_lookup(sender, using, **kwargs):
+    # Версия меняется только после фиксации: иначе другой процесс мог бы
+    # перечитать еще старые строки и закэшировать их под новой версией.
+    transaction.on_commit(LOOKUPS[sender].invalidate, using=using)
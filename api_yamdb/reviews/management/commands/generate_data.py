@@ -0,0 +1,334 @@
+import csv
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from reviews import leaderboards, ratings
+from reviews.models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+GenreTitle = Title.genre.through
+
+# Имя CSV-файла, модель и колонки в той же схеме, что и static/data.
+TABLES = (
+    ('users', User, (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    )),
+    ('category', Category, ('id', 'name', 'slug')),
+    ('genre', Genre, ('id', 'name', 'slug')),
+    ('titles', Title, ('id', 'name', 'year', 'category')),
+    ('genre_title', GenreTitle, ('id', 'title_id', 'genre_id')),
+    ('review', Review, (
+        'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+    )),
+    ('comments', Comment, ('id', 'review_id', 'text', 'author', 'pub_date')),
+)
+ATTNAMES = {'category': 'category_id', 'author': 'author_id'}
+# Даты отзывов и комментариев отсчитываются назад от этого момента,
+# а не от текущего времени, чтобы данные зависели только от --seed.
+DEFAULT_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TEXT_POOL_SIZE = 2000
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+def chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class CsvSink:
+    """Пишет строки в CSV-файлы схемы static/data."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def next_id(self, model):
+        return 1
+
+    def write(self, name, model, columns, rows, batch_size):
+        count = 0
+        path = self.directory / f'{name}.csv'
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(
+                    value.isoformat() if hasattr(value, 'isoformat')
+                    else value
+                    for value in row
+                )
+                count += 1
+        return count
+
+    def finish(self):
+        pass
+
+
+class DatabaseSink:
+    """Пишет строки в базу пакетами через bulk_create."""
+
+    def next_id(self, model):
+        return (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+
+    def write(self, name, model, columns, rows, batch_size):
+        attnames = [ATTNAMES.get(column, column) for column in columns]
+        extra = {'password': '!'} if model is User else {}
+        count = 0
+        for chunk in chunks(rows, batch_size):
+            model.objects.bulk_create(
+                [model(**dict(zip(attnames, row)), **extra) for row in chunk],
+                batch_size=batch_size
+            )
+            count += len(chunk)
+        return count
+
+    def finish(self):
+        models = [model for _, model, _ in TABLES]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+        # bulk_create обходит поддержку денормализованных данных.
+        ratings.rebuild()
+        leaderboards.rebuild()
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетический каталог для нагрузочного тестирования: '
+        'степенное число отзывов на произведение, скошенное число '
+        'комментариев, длины текстов по образцам из static/data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--genres', type=int, default=15)
+        parser.add_argument('--categories', type=int, default=3)
+        parser.add_argument(
+            '--reviews-alpha', type=float, default=1.5,
+            help='показатель степенного распределения отзывов'
+        )
+        parser.add_argument(
+            '--reviews-scale', type=float, default=5,
+            help='масштаб числа отзывов на произведение'
+        )
+        parser.add_argument(
+            '--comments-mean', type=float, default=1.5,
+            help='среднее число комментариев на отзыв'
+        )
+        parser.add_argument('--days', type=int, default=3 * 365)
+        parser.add_argument(
+            '--now', type=aware_datetime, default=DEFAULT_NOW,
+            help='момент ISO 8601, от которого отсчитываются даты '
+                 f'(по умолчанию {DEFAULT_NOW.isoformat()})'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--csv', metavar='DIR',
+            help='записать CSV в каталог вместо базы данных'
+        )
+        parser.add_argument(
+            '--sample-dir', default=settings.BASE_DIR / 'static' / 'data'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.now = options['now']
+        self.load_samples(Path(options['sample_dir']))
+        sink = CsvSink(options['csv']) if options['csv'] else DatabaseSink()
+        with transaction.atomic(), keep_pub_date():
+            self.ids = {
+                model: sink.next_id(model) for _, model, _ in TABLES
+            }
+            for name, model, columns in TABLES:
+                rows = getattr(self, f'generate_{name}')()
+                count = sink.write(
+                    name, model, columns, rows, options['batch_size']
+                )
+                self.stdout.write(f'{name}: {count}')
+            sink.finish()
+
+    def load_samples(self, sample_dir):
+        reviews = read_csv(sample_dir / 'review.csv')
+        comments = read_csv(sample_dir / 'comments.csv')
+        self.category_names = [
+            row['name'] for row in read_csv(sample_dir / 'category.csv')
+        ]
+        self.genre_names = [
+            row['name'] for row in read_csv(sample_dir / 'genre.csv')
+        ]
+        self.title_names = [
+            row['name'] for row in read_csv(sample_dir / 'titles.csv')
+        ]
+        # Сглаживание на единицу: в образцах встречаются не все оценки.
+        scores = Counter(int(row['score']) for row in reviews)
+        self.score_weights = [scores[score] + 1 for score in range(1, 11)]
+        fan_out = Counter(
+            Counter(
+                row['title_id']
+                for row in read_csv(sample_dir / 'genre_title.csv')
+            ).values()
+        )
+        self.fan_out_values = list(fan_out)
+        self.fan_out_weights = list(fan_out.values())
+        self.review_texts = self.text_pool(reviews + comments, reviews)
+        self.comment_texts = self.text_pool(reviews + comments, comments)
+
+    def text_pool(self, corpus, length_samples):
+        """Тексты из слов образцов с длинами, как у образцов."""
+        words = ' '.join(row['text'] for row in corpus).split()
+        lengths = [len(row['text']) for row in length_samples]
+        pool = []
+        for _ in range(TEXT_POOL_SIZE):
+            target = self.rng.choice(lengths)
+            text = []
+            size = 0
+            while size < target:
+                word = self.rng.choice(words)
+                text.append(word)
+                size += len(word) + 1
+            pool.append(' '.join(text))
+        return pool
+
+    def id_range(self, model, count):
+        start = self.ids[model]
+        return range(start, start + count)
+
+    def generate_users(self):
+        self.user_ids = self.id_range(User, self.options['users'])
+        for user_id in self.user_ids:
+            yield (
+                user_id, f'user{user_id}', f'user{user_id}@yamdb.fake',
+                'user', '', '', ''
+            )
+
+    def generate_category(self):
+        self.category_ids = self.id_range(
+            Category, self.options['categories']
+        )
+        for index, category_id in enumerate(self.category_ids):
+            name = self.category_names[index % len(self.category_names)]
+            yield category_id, f'{name} {category_id}', f'cat-{category_id}'
+
+    def generate_genre(self):
+        self.genre_ids = self.id_range(Genre, self.options['genres'])
+        for index, genre_id in enumerate(self.genre_ids):
+            name = self.genre_names[index % len(self.genre_names)]
+            yield genre_id, f'{name} {genre_id}', f'genre-{genre_id}'
+
+    def generate_titles(self):
+        self.title_ids = self.id_range(Title, self.options['titles'])
+        for title_id in self.title_ids:
+            yield (
+                title_id,
+                f'{self.rng.choice(self.title_names)} {title_id}',
+                self.rng.randint(1900, self.now.year),
+                self.rng.choice(self.category_ids),
+            )
+
+    def generate_genre_title(self):
+        # Популярность жанров убывает как 1/ранг.
+        genre_weights = [
+            1 / rank for rank in range(1, len(self.genre_ids) + 1)
+        ]
+        row_id = self.ids[GenreTitle]
+        for title_id in self.title_ids:
+            fan_out = self.rng.choices(
+                self.fan_out_values, self.fan_out_weights
+            )[0]
+            genres = set(self.rng.choices(
+                self.genre_ids, genre_weights, k=fan_out
+            ))
+            for genre_id in sorted(genres):
+                yield row_id, title_id, genre_id
+                row_id += 1
+
+    def generate_review(self):
+        alpha = self.options['reviews_alpha']
+        scale = self.options['reviews_scale']
+        days = self.options['days']
+        review_id = self.ids[Review]
+        # Для комментариев нужны только id и дата отзыва.
+        self.reviews = []
+        for title_id in self.title_ids:
+            count = min(
+                len(self.user_ids),
+                int(scale * (self.rng.paretovariate(alpha) - 1))
+            )
+            for author_id in self.rng.sample(self.user_ids, count):
+                pub_date = self.now - timedelta(
+                    seconds=self.rng.randrange(days * 24 * 3600)
+                )
+                yield (
+                    review_id, title_id,
+                    self.rng.choice(self.review_texts), author_id,
+                    self.rng.choices(range(1, 11), self.score_weights)[0],
+                    pub_date,
+                )
+                self.reviews.append((review_id, pub_date))
+                review_id += 1
+
+    def generate_comments(self):
+        mean = self.options['comments_mean']
+        comment_id = self.ids[Comment]
+        for review_id, review_date in self.reviews:
+            count = int(self.rng.expovariate(1 / mean)) if mean > 0 else 0
+            age = max(1, int((self.now - review_date).total_seconds()))
+            for _ in range(count):
+                yield (
+                    comment_id, review_id,
+                    self.rng.choice(self.comment_texts),
+                    self.rng.choice(self.user_ids),
+                    review_date + timedelta(
+                        seconds=self.rng.randrange(age)
+                    ),
+                )
+                comment_id += 1
+
+
+def aware_datetime(value):
+    """Дата и время ISO 8601; без часового пояса считается UTC."""
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+class keep_pub_date:
+    """
+    Временно отключает auto_now_add у pub_date,
+    чтобы bulk_create сохранил сгенерированные даты.
+    """
+    fields = (
+        Review._meta.get_field('pub_date'),
+        Comment._meta.get_field('pub_date'),
+    )
+
+    def __enter__(self):
+        for field in self.fields:
+            field.auto_now_add = False
+
+    def __exit__(self, *exc_info):
+        for field in self.fields:
+            field.auto_now_add = True
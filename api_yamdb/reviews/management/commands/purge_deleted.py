@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews import purge
+
+
+class Command(BaseCommand):
+    help = (
+        'Порциями удаляет произведения, отзывы и пользователей, '
+        'помеченные на удаление, вместе с их потомками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.PURGE_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='работать постоянно, проверяя очередь раз в --interval с'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=settings.PURGE_INTERVAL
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = purge.purge(options['batch_size'])
+            if deleted:
+                self.stdout.write(f'Удалено строк: {deleted}.')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews import leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает предрасчитанные рейтинги произведений.'
+
+    def handle(self, *args, **options):
+        leaderboards.rebuild()
+        self.stdout.write('Рейтинги пересчитаны.')
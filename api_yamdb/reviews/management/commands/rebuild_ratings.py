@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews import ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает гистограммы оценок и рейтинги произведений.'
+
+    def handle(self, *args, **options):
+        ratings.rebuild()
+        self.stdout.write('Гистограммы оценок пересчитаны.')
@@ -0,0 +1,63 @@
+# Generated by Django 3.2 on 2026-10-19 14:00
+
+from functools import reduce
+from operator import add
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_reviews_count(apps, schema_editor):
+    apps.get_model('reviews', 'Title').objects.update(reviews_count=reduce(
+        add, (F(f'score_{score}') for score in range(1, 11))
+    ))
+
+
+def create_rating_desc_index(apps, schema_editor):
+    # PostgreSQL не может обойти индекс (rating, id) в порядке
+    # DESC NULLS LAST; SQLite и MySQL обходят его в обе стороны.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX title_rating_desc_idx ON reviews_title '
+            '(rating DESC NULLS LAST, id DESC)'
+        )
+
+
+def drop_rating_desc_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX title_rating_desc_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_score_histogram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='reviews_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='число отзывов'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'id'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'id'], name='title_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['reviews_count', 'id'], name='title_reviews_count_idx'),
+        ),
+        migrations.RunPython(fill_reviews_count, migrations.RunPython.noop),
+        migrations.RunPython(
+            create_rating_desc_index, drop_rating_desc_index
+        ),
+    ]
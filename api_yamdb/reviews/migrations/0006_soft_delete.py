@@ -0,0 +1,66 @@
+# Generated by Django 3.2 on 2026-10-19 14:19
+
+from django.db import migrations, models
+
+# Внешние ключи, которые на PostgreSQL удаляют строки каскадом
+# на уровне СУБД, см. reviews.purge: (таблица, столбец, ссылка).
+DB_CASCADES = (
+    ('reviews_comment', 'review_id', 'reviews_review'),
+    ('reviews_comment', 'author_id', 'users_myuser'),
+    ('reviews_review', 'title_id', 'reviews_title'),
+    ('reviews_review', 'author_id', 'users_myuser'),
+    ('reviews_title_genre', 'title_id', 'reviews_title'),
+    ('reviews_leaderboardentry', 'title_id', 'reviews_title'),
+)
+
+
+def set_foreign_keys(schema_editor, on_delete):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for table, column, target in DB_CASCADES:
+            constraints = connection.introspection.get_constraints(
+                cursor, table
+            )
+            for name, constraint in constraints.items():
+                if (
+                    constraint['foreign_key']
+                    and constraint['columns'] == [column]
+                ):
+                    schema_editor.execute(
+                        f'ALTER TABLE {table} DROP CONSTRAINT {name}, '
+                        f'ADD CONSTRAINT {name} FOREIGN KEY ({column}) '
+                        f'REFERENCES {target} (id) {on_delete} '
+                        'DEFERRABLE INITIALLY DEFERRED'
+                    )
+
+
+def add_db_cascades(apps, schema_editor):
+    set_foreign_keys(schema_editor, 'ON DELETE CASCADE')
+
+
+def remove_db_cascades(apps, schema_editor):
+    set_foreign_keys(schema_editor, '')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_ordering_indexes'),
+        ('users', '0003_myuser_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='удален'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='удалено'),
+        ),
+        migrations.RunPython(add_db_cascades, remove_db_cascades),
+    ]
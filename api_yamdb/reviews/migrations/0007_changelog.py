@@ -0,0 +1,36 @@
+# Generated by Django 3.2 on 2026-10-19 14:23
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(choices=[('title', 'произведение'), ('review', 'отзыв'), ('comment', 'комментарий')], max_length=10, verbose_name='модель')),
+                ('action', models.CharField(choices=[('create', 'создание'), ('update', 'изменение'), ('delete', 'удаление')], max_length=10, verbose_name='действие')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='id объекта')),
+                ('title_id', models.PositiveBigIntegerField(verbose_name='id произведения')),
+                ('review_id', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='id отзыва')),
+                ('data', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='данные')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='время изменения')),
+            ],
+            options={
+                'verbose_name': 'Изменение',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ('id',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['title_id', 'id'], name='changelog_title_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-19 15:30
+
+from django.db import migrations
+
+
+def create_name_prefix_index(apps, schema_editor):
+    # Поиск админки по началу названия (name__istartswith) на PostgreSQL
+    # — это UPPER(name::text) LIKE 'X%'. При сопоставлении, отличном
+    # от C, его обслуживает только индекс с text_pattern_ops по тому
+    # же выражению; индекс (name, id) для сортировки не подходит.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX title_name_prefix_idx ON reviews_title '
+            '(UPPER(name::text) text_pattern_ops)'
+        )
+
+
+def drop_name_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX title_name_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_changelog'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_name_prefix_index, drop_name_prefix_index
+        ),
+    ]
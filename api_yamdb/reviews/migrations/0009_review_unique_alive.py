@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-19 15:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_name_prefix_index'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='review',
+            name='unique_author_title',
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(condition=models.Q(deleted_at__isnull=True), fields=('author', 'title'), name='unique_author_title'),
+        ),
+    ]
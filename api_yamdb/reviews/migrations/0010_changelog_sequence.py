@@ -0,0 +1,54 @@
+# Generated by Django 3.2 on 2026-10-19 15:35
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def number_entries(apps, schema_editor):
+    # Записи, уже отданные зеркалам, сохраняют свои номера.
+    alias = schema_editor.connection.alias
+    entries = apps.get_model('reviews', 'ChangeLogEntry').objects.using(alias)
+    entries.update(sequence=F('id'))
+    last = entries.aggregate(last=Max('id'))['last']
+    apps.get_model('reviews', 'ChangeLogCounter').objects.using(alias).create(
+        pk=1, value=last or 0
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_review_unique_alive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveBigIntegerField(default=0, verbose_name='последний номер')),
+            ],
+            options={
+                'verbose_name': 'Счетчик журнала изменений',
+                'verbose_name_plural': 'Счетчик журнала изменений',
+            },
+        ),
+        migrations.AlterModelOptions(
+            name='changelogentry',
+            options={'ordering': ('sequence',), 'verbose_name': 'Изменение', 'verbose_name_plural': 'Журнал изменений'},
+        ),
+        migrations.RemoveIndex(
+            model_name='changelogentry',
+            name='changelog_title_idx',
+        ),
+        migrations.AddField(
+            model_name='changelogentry',
+            name='sequence',
+            field=models.PositiveBigIntegerField(blank=True, null=True, unique=True, verbose_name='номер'),
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['title_id', 'sequence'], name='changelog_title_seq_idx'),
+        ),
+        migrations.RunPython(number_entries, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import (
     MinValueValidator, MaxValueValidator, RegexValidator
 )
@@ -8,6 +9,20 @@ from .validators import validate_year
 
 User = get_user_model()
 
+SCORES = range(1, 11)
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """Выборки по отложенному удалению, см. reviews.purge."""
+
+    def alive(self):
+        """Записи, не помеченные на удаление."""
+        return self.filter(deleted_at__isnull=True)
+
+    def deleted(self):
+        """Записи, ожидающие фонового удаления."""
+        return self.filter(deleted_at__isnull=False)
+
 
 class Category(models.Model):
     """Модель категорий произведений."""
@@ -88,17 +103,53 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='жанр'
     )
+    # Гистограмма оценок и выведенный из нее средний рейтинг,
+    # см. reviews.ratings.
+    score_1 = models.PositiveIntegerField('оценок 1', default=0)
+    score_2 = models.PositiveIntegerField('оценок 2', default=0)
+    score_3 = models.PositiveIntegerField('оценок 3', default=0)
+    score_4 = models.PositiveIntegerField('оценок 4', default=0)
+    score_5 = models.PositiveIntegerField('оценок 5', default=0)
+    score_6 = models.PositiveIntegerField('оценок 6', default=0)
+    score_7 = models.PositiveIntegerField('оценок 7', default=0)
+    score_8 = models.PositiveIntegerField('оценок 8', default=0)
+    score_9 = models.PositiveIntegerField('оценок 9', default=0)
+    score_10 = models.PositiveIntegerField('оценок 10', default=0)
+    rating = models.FloatField('рейтинг', null=True, blank=True)
+    reviews_count = models.PositiveIntegerField('число отзывов', default=0)
+    deleted_at = models.DateTimeField(
+        'удалено', null=True, blank=True, db_index=True
+    )
+
+    objects = SoftDeleteQuerySet.as_manager()
 
     class Meta:
         """Класс Meta для настроек модели."""
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name',)
+        # Индексы под сортировки api.filters.TitleOrderingFilter.
+        indexes = [
+            models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+            models.Index(fields=['year', 'id'], name='title_year_idx'),
+            models.Index(fields=['name', 'id'], name='title_name_idx'),
+            models.Index(
+                fields=['reviews_count', 'id'],
+                name='title_reviews_count_idx'
+            ),
+        ]
 
     def __str__(self):
         """Строковое представление объекта произведения."""
         return self.name
 
+    @property
+    def score_distribution(self):
+        """Число отзывов с каждой оценкой от 1 до 10."""
+        return {
+            score: getattr(self, f'score_{score}') for score in SCORES
+        }
+
 
 class Review(models.Model):
     """Модель отзывов на произведения."""
@@ -128,14 +179,22 @@ class Review(models.Model):
         'дата публикации',
         auto_now_add=True
     )
+    deleted_at = models.DateTimeField(
+        'удален', null=True, blank=True, db_index=True
+    )
+
+    objects = SoftDeleteQuerySet.as_manager()
 
     class Meta:
         """Класс Meta для настроек модели."""
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         constraints = [
+            # Помеченный на удаление отзыв ждет purge_deleted
+            # и не мешает автору написать новый.
             models.UniqueConstraint(
                 fields=['author', 'title'],
+                condition=models.Q(deleted_at__isnull=True),
                 name='unique_author_title'
             )
         ]
@@ -175,3 +234,111 @@ class Comment(models.Model):
     def __str__(self):
         """Строковое представление объекта комментария."""
         return self.text
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Позиция произведения в предрасчитанном рейтинге.
+    Рейтинги: общий, по категории и по жанру, для средней оценки
+    и для популярности за последнее время.
+    """
+    board = models.CharField('рейтинг', max_length=50)
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        verbose_name='произведение'
+    )
+    score = models.FloatField('очки')
+
+    class Meta:
+        verbose_name = 'Позиция в рейтинге'
+        verbose_name_plural = 'Позиции в рейтингах'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['board', 'title'],
+                name='unique_board_title'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['board', '-score', 'title'],
+                name='leaderboard_board_score'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.board}: {self.title_id} ({self.score})'
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Запись журнала изменений произведений, отзывов и комментариев.
+    Номер записи (sequence) выдается при завершении транзакции
+    изменения и растет в порядке их фиксации; по нему зеркала
+    забирают только новые изменения, см. reviews.changelog.
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTIONS = (
+        (CREATE, 'создание'),
+        (UPDATE, 'изменение'),
+        (DELETE, 'удаление'),
+    )
+    TITLE = 'title'
+    REVIEW = 'review'
+    COMMENT = 'comment'
+    MODELS = (
+        (TITLE, 'произведение'),
+        (REVIEW, 'отзыв'),
+        (COMMENT, 'комментарий'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    sequence = models.PositiveBigIntegerField(
+        'номер', null=True, blank=True, unique=True
+    )
+    model = models.CharField('модель', max_length=10, choices=MODELS)
+    action = models.CharField('действие', max_length=10, choices=ACTIONS)
+    object_id = models.PositiveBigIntegerField('id объекта')
+    title_id = models.PositiveBigIntegerField('id произведения')
+    review_id = models.PositiveBigIntegerField(
+        'id отзыва', null=True, blank=True
+    )
+    data = models.JSONField(
+        'данные', null=True, blank=True, encoder=DjangoJSONEncoder
+    )
+    created_at = models.DateTimeField('время изменения', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ('sequence',)
+        indexes = [
+            models.Index(
+                fields=['title_id', 'sequence'],
+                name='changelog_title_seq_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f'{self.sequence}: {self.action} {self.model} {self.object_id}'
+        )
+
+
+class ChangeLogCounter(models.Model):
+    """
+    Последний выданный номер журнала изменений. Единственная строка
+    блокируется транзакцией изменения до ее фиксации, поэтому номера
+    выдаются в порядке фиксации транзакций.
+    """
+    value = models.PositiveBigIntegerField('последний номер', default=0)
+
+    class Meta:
+        verbose_name = 'Счетчик журнала изменений'
+        verbose_name_plural = 'Счетчик журнала изменений'
+
+    def __str__(self):
+        return str(self.value)
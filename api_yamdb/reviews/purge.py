@@ -0,0 +1,173 @@
+"""
+Отложенное удаление произведений, отзывов и пользователей.
+
+Удаление записи с большим поддеревом (больше
+`DEFERRED_DELETE_THRESHOLD` отзывов и комментариев) не выполняется
+в запросе: запись помечается `deleted_at` и пропадает из API,
+а потомков порциями по `PURGE_BATCH_SIZE` строк удаляет команда
+`purge_deleted`. Каждая порция — отдельная короткая транзакция,
+поэтому запрос и блокировки не держатся секундами. Небольшие
+поддеревья удаляются сразу, как раньше.
+
+На PostgreSQL внешние ключи на отзывы, произведения и пользователей
+объявлены с ON DELETE CASCADE (миграция reviews 0006), поэтому
+порция отзывов удаляется одним DELETE вместе с комментариями.
+На остальных СУБД комментарии удаляются отдельными порциями.
+
+Удаление отзывов и комментариев пользователя записывается в журнал
+изменений (reviews.changelog) в той же транзакции, что и порция.
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from . import changelog, leaderboards, ratings
+from .models import Comment, Review, Title
+
+User = get_user_model()
+
+DB_CASCADE_VENDORS = ('postgresql',)
+
+
+def uses_db_cascade():
+    return connection.vendor in DB_CASCADE_VENDORS
+
+
+def _descendants(model, pk):
+    """
+    Наборы потомков в порядке удаления: (queryset, удаляется ли набор
+    каскадом СУБД вместе со следующим).
+    """
+    if model is Title:
+        return (
+            (Comment.objects.filter(review__title_id=pk), True),
+            (Review.objects.filter(title_id=pk), False),
+        )
+    if model is Review:
+        return ((Comment.objects.filter(review_id=pk), False),)
+    return (
+        (Comment.objects.filter(author_id=pk), False),
+        (Comment.objects.filter(review__author_id=pk), True),
+        (Review.objects.filter(author_id=pk), False),
+    )
+
+
+def subtree_exceeds(model, pk, limit):
+    """Больше ли `limit` потомков у записи; считает не дальше limit."""
+    remaining = limit
+    for queryset, _ in _descendants(model, pk):
+        remaining -= queryset.order_by()[:remaining + 1].count()
+        if remaining < 0:
+            return True
+    return False
+
+
+def should_defer(model, pk):
+    return subtree_exceeds(model, pk, settings.DEFERRED_DELETE_THRESHOLD)
+
+
+def mark_deleted(instance):
+    """Помечает запись на фоновое удаление."""
+    fields = {'deleted_at': timezone.now()}
+    if isinstance(instance, User):
+        # Помеченный пользователь больше не проходит аутентификацию.
+        fields['is_active'] = False
+    type(instance).objects.filter(pk=instance.pk).update(**fields)
+
+
+def _delete_ids(model, ids):
+    """Удаляет строки по id; на PostgreSQL — одним DELETE с каскадом."""
+    if not uses_db_cascade():
+        model.objects.filter(pk__in=ids).delete()
+        return
+    table = connection.ops.quote_name(model._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE id IN ({placeholders})', ids
+        )
+
+
+def forget_scores(review_ids):
+    """
+    Убирает из гистограмм и рейтингов оценки удаляемых отзывов, которые
+    еще учтены: отзыв и его произведение не помечены на удаление.
+    Вызывается в транзакции удаления.
+    """
+    deltas = defaultdict(Counter)
+    pub_dates = defaultdict(list)
+    for title_id, score, pub_date in Review.objects.filter(
+        pk__in=review_ids, deleted_at__isnull=True,
+        title__deleted_at__isnull=True
+    ).values_list('title_id', 'score', 'pub_date'):
+        deltas[title_id][score] -= 1
+        pub_dates[title_id].append(pub_date)
+    for title_id, title_deltas in deltas.items():
+        ratings.apply_deltas(title_id, title_deltas)
+        leaderboards.refresh_scores(title_id, removed=pub_dates[title_id])
+
+
+def delete_now(model, ids):
+    """
+    Сразу удаляет отзывы или пользователей по id вместе с поддеревом:
+    записывает удаление в журнал изменений и убирает из гистограмм
+    и рейтингов оценки удаляемых отзывов. Вызывается внутри
+    changelog.atomic().
+    """
+    if model is Review:
+        reviews = Review.objects.filter(pk__in=ids)
+    else:
+        reviews = Review.objects.filter(author_id__in=ids)
+        changelog.record_deletes(
+            Comment, Comment.objects.filter(author_id__in=ids).values('id')
+        )
+    changelog.record_deletes(Review, reviews.values('id'))
+    forget_scores(reviews.values('id'))
+    model.objects.filter(pk__in=ids).delete()
+
+
+def purge_step(batch_size=None):
+    """
+    Удаляет одну порцию потомков самой давно помеченной записи,
+    а когда их не осталось — саму запись. Возвращает число удаленных
+    строк; 0 — удалять больше нечего.
+    """
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    for model in (Review, Title, User):
+        pk = model.objects.deleted().order_by('deleted_at', 'pk').values_list(
+            'pk', flat=True
+        ).first()
+        if pk is None:
+            continue
+        for queryset, cascaded in _descendants(model, pk):
+            if cascaded and uses_db_cascade():
+                continue
+            ids = list(
+                queryset.order_by().values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                continue
+            with changelog.atomic():
+                if model is User and not cascaded:
+                    # Отзывы и комментарии пропадают из API только сейчас.
+                    changelog.record_deletes(queryset.model, ids)
+                if queryset.model is Review:
+                    forget_scores(ids)
+                _delete_ids(queryset.model, ids)
+            return len(ids)
+        model.objects.filter(pk=pk).delete()
+        return 1
+    return 0
+
+
+def purge(batch_size=None):
+    """Удаляет все помеченные записи. Возвращает число удаленных строк."""
+    total = 0
+    while True:
+        deleted = purge_step(batch_size)
+        if not deleted:
+            return total
+        total += deleted
@@ -0,0 +1,88 @@
+"""
+Гистограммы оценок произведений.
+
+У каждого произведения десять счетчиков `score_1` … `score_10`;
+средний рейтинг `Title.rating` и число отзывов `Title.reviews_count`
+выводятся из них в том же UPDATE, поэтому среднее и распределение
+всегда согласованы и читаются
+из одной строки без агрегации по отзывам.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Value
+from django.db.models.functions import Cast, NullIf
+
+from .models import SCORES, Review, Title
+
+SCORE_FIELDS = tuple(f'score_{score}' for score in SCORES)
+
+
+def update_histogram(title_id, added=None, removed=None):
+    """
+    Учитывает добавленную и/или удаленную оценку одним UPDATE.
+    Изменение оценки — это удаление старой и добавление новой.
+    """
+    if added == removed:
+        return
+    deltas = Counter()
+    if removed is not None:
+        deltas[removed] -= 1
+    if added is not None:
+        deltas[added] += 1
+    apply_deltas(title_id, deltas)
+
+
+def apply_deltas(title_id, deltas):
+    """
+    Меняет счетчики оценок на `deltas` ({оценка: изменение}) одним
+    UPDATE, например при фоновом удалении пачки отзывов.
+    """
+    updates = {
+        f'score_{score}': F(f'score_{score}') + delta
+        for score, delta in deltas.items() if delta
+    }
+    if not updates:
+        return
+    delta_sum = sum(score * delta for score, delta in deltas.items())
+    delta_count = sum(deltas.values())
+    # Правые части UPDATE видят значения строки до изменения.
+    total = sum(
+        (score * F(f'score_{score}') for score in SCORES), Value(delta_sum)
+    )
+    count = sum(
+        (F(f'score_{score}') for score in SCORES), Value(delta_count)
+    )
+    updates['rating'] = Cast(total, FloatField()) / NullIf(count, 0)
+    updates['reviews_count'] = F('reviews_count') + delta_count
+    Title.objects.filter(pk=title_id).update(**updates)
+
+
+def rebuild(batch_size=5000):
+    """Полный пересчет гистограмм по таблице отзывов."""
+    histograms = defaultdict(dict)
+    for title_id, score, count in Review.objects.alive().values(
+        'title_id', 'score'
+    ).annotate(count=Count('id')).order_by().values_list(
+        'title_id', 'score', 'count'
+    ).iterator():
+        histograms[title_id][score] = count
+    titles = []
+    for title_id, histogram in histograms.items():
+        title = Title(pk=title_id)
+        for score in SCORES:
+            setattr(title, f'score_{score}', histogram.get(score, 0))
+        title.reviews_count = sum(histogram.values())
+        title.rating = sum(
+            score * count for score, count in histogram.items()
+        ) / title.reviews_count
+        titles.append(title)
+    with transaction.atomic():
+        Title.objects.update(
+            rating=None, reviews_count=0,
+            **{field: 0 for field in SCORE_FIELDS}
+        )
+        Title.objects.bulk_update(
+            titles, SCORE_FIELDS + ('rating', 'reviews_count'),
+            batch_size=batch_size
+        )
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.contrib import admin
+from reviews import changelog, purge
 
 User = get_user_model()
 
@@ -14,6 +15,18 @@ class UserAdmin(admin.ModelAdmin):
         'bio',
         'role',
     )
+    # Поиск по началу имени для автодополнения авторов
+    # в админке отзывов и комментариев, на PostgreSQL —
+    # по индексу myuser_username_prefix_idx.
+    search_fields = ('^username',)
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, User.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        # Оценки отзывов удаляемых пользователей убираются из рейтингов.
+        with changelog.atomic():
+            purge.delete_now(User, queryset.values('id'))
 
 
 admin.site.register(User, UserAdmin)
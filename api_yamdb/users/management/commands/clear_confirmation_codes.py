@@ -0,0 +1,12 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Удаляет просроченные коды подтверждения.'
+
+    def handle(self, *args, **options):
+        cleared = User.objects.clear_expired_confirmation_codes()
+        self.stdout.write(f'Удалено просроченных кодов: {cleared}')
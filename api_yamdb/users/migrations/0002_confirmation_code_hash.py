@@ -0,0 +1,36 @@
+# Generated by Django 3.2 on 2026-10-19 13:46
+
+from django.db import migrations, models
+import users.models
+
+
+def clear_plaintext_codes(apps, schema_editor):
+    # Старые коды хранились открытым текстом и не пройдут проверку хеша.
+    apps.get_model('users', 'MyUser').objects.update(confirmation_code=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='myuser',
+            managers=[
+                ('objects', users.models.MyUserManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='myuser',
+            name='confirmation_code_expires',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Код подтверждения действует до'),
+        ),
+        migrations.AlterField(
+            model_name='myuser',
+            name='confirmation_code',
+            field=models.CharField(max_length=100, null=True, verbose_name='Хеш кода подтверждения'),
+        ),
+        migrations.RunPython(clear_plaintext_codes, migrations.RunPython.noop),
+    ]
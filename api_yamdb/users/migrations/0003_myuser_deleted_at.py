@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-19 14:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_confirmation_code_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='myuser',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Удален'),
+        ),
+    ]
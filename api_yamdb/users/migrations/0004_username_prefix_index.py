@@ -0,0 +1,32 @@
+# Generated by Django 3.2 on 2026-10-19 15:30
+
+from django.db import migrations
+
+
+def create_username_prefix_index(apps, schema_editor):
+    # Автодополнение авторов в админке ищет по началу имени
+    # (username__istartswith): на PostgreSQL ему нужен индекс
+    # с text_pattern_ops по UPPER(username::text).
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX myuser_username_prefix_idx ON users_myuser '
+            '(UPPER(username::text) text_pattern_ops)'
+        )
+
+
+def drop_username_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX myuser_username_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_myuser_deleted_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_username_prefix_index, drop_username_prefix_index
+        ),
+    ]
@@ -1,6 +1,9 @@
-from django.contrib.auth.models import AbstractUser
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 from django.core.validators import RegexValidator
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
 
 
 ADMIN = 'admin'
@@ -12,6 +15,29 @@ ROLE_CHOICES = (
     (USER, 'Пользователь'),
 )
 
+CONFIRMATION_CODE_SALT = 'users.MyUser.confirmation_code'
+
+
+class MyUserManager(UserManager):
+    """
+    Менеджер пользователей с массовой очисткой кодов подтверждения
+    и выборками по отложенному удалению.
+    """
+
+    def alive(self):
+        """Пользователи, не помеченные на удаление."""
+        return self.filter(deleted_at__isnull=True)
+
+    def deleted(self):
+        """Пользователи, ожидающие фонового удаления."""
+        return self.filter(deleted_at__isnull=False)
+
+    def clear_expired_confirmation_codes(self):
+        """Удаляет просроченные коды одним UPDATE."""
+        return self.filter(
+            confirmation_code_expires__lt=timezone.now()
+        ).update(confirmation_code=None, confirmation_code_expires=None)
+
 
 class MyUser(AbstractUser):
     """Модель пользователя."""
@@ -42,10 +68,24 @@ class MyUser(AbstractUser):
         help_text='Выберите роль пользователя.',
     )
     confirmation_code = models.CharField(
-        'Код подтверждения',
+        'Хеш кода подтверждения',
         max_length=100,
         null=True,
     )
+    confirmation_code_expires = models.DateTimeField(
+        'Код подтверждения действует до',
+        null=True,
+        blank=True,
+    )
+    # Помечен на удаление, см. reviews.purge.
+    deleted_at = models.DateTimeField(
+        'Удален',
+        null=True,
+        blank=True,
+        db_index=True,
+    )
+
+    objects = MyUserManager()
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -55,6 +95,30 @@ class MyUser(AbstractUser):
     def __str__(self):
         return self.username
 
+    def _hash_confirmation_code(self, code):
+        return salted_hmac(
+            CONFIRMATION_CODE_SALT, f'{self.username}:{code}',
+            algorithm='sha256'
+        ).hexdigest()
+
+    def set_confirmation_code(self, code):
+        """Сохраняет хеш кода и срок его действия."""
+        self.confirmation_code = self._hash_confirmation_code(code)
+        self.confirmation_code_expires = (
+            timezone.now() + settings.CONFIRMATION_CODE_LIFETIME
+        )
+
+    def check_confirmation_code(self, code):
+        """Проверяет код за постоянное время."""
+        if not self.confirmation_code or (
+            self.confirmation_code_expires is None
+            or self.confirmation_code_expires < timezone.now()
+        ):
+            return False
+        return constant_time_compare(
+            self._hash_confirmation_code(code), self.confirmation_code
+        )
+
     @property
     def is_admin(self):
         return self.role == ADMIN or self.is_superuser
@@ -0,0 +1,75 @@
+"""
+Сравнение пропускной способности синхронных DRF-вьюсетов и async-вью
+каталога под ASGI.
+
+Запуск из корня репозитория:
+    python benchmarks/asgi_catalog.py --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from catalog import add_size_arguments, seed_catalog, test_database
+
+from django.test import AsyncClient
+
+SYNC_URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/{title_id}/',
+    '/api/v1/titles/{title_id}/reviews/',
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+)
+ASYNC_URLS = tuple(
+    url.replace('/api/v1/', '/api/v1/async/') for url in SYNC_URLS
+)
+
+
+async def run(urls, total, concurrency):
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index):
+        async with semaphore:
+            response = await client.get(urls[index % len(urls)])
+            assert response.status_code == 200, response.status_code
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    with test_database():
+        titles, reviews, _, _ = seed_catalog(
+            titles=args.titles, genres=args.genres,
+            categories=args.categories, users=args.users,
+            reviews_per_title=args.reviews_per_title,
+            comments_per_review=args.comments_per_review, seed=args.seed,
+            genres_per_title=args.genres_per_title
+        )
+        report = {}
+        for name, urls in (('sync', SYNC_URLS), ('async', ASYNC_URLS)):
+            urls = [
+                url.format(
+                    title_id=reviews[0].title_id, review_id=reviews[0].id
+                )
+                for url in urls
+            ]
+            report[name] = {
+                'requests_per_second': round(asyncio.run(
+                    run(urls, args.requests, args.concurrency)
+                ), 1),
+            }
+        report['concurrency'] = args.concurrency
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Общая часть бенчмарков: настройка Django, тестовая база
+и синтетический каталог заданного размера.
+"""
+import os
+import random
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment, teardown_test_environment
+)
+
+from reviews import leaderboards, ratings  # noqa: E402
+from reviews.models import (  # noqa: E402
+    Category, Comment, Genre, Review, Title
+)
+
+User = get_user_model()
+
+REVIEW_TEXT = 'Отличное произведение, рекомендую к просмотру. '
+COMMENT_TEXT = 'Полностью согласен с автором отзыва. '
+
+
+def add_size_arguments(parser):
+    """Аргументы командной строки для размера каталога."""
+    parser.add_argument('--titles', type=int, default=200)
+    parser.add_argument('--genres', type=int, default=10)
+    parser.add_argument('--genres-per-title', type=int, default=2)
+    parser.add_argument('--categories', type=int, default=3)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--reviews-per-title', type=int, default=10)
+    parser.add_argument('--comments-per-review', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+
+
+@contextmanager
+def test_database():
+    """Временная база, как у тестов; удаляется по выходе."""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def seed_catalog(titles=200, genres=10, categories=3, users=50,
+                 reviews_per_title=10, comments_per_review=2, seed=42,
+                 genres_per_title=2):
+    """
+    Заполняет базу синтетическим каталогом.
+    SQLite в Django 3.2 не возвращает id из bulk_create,
+    поэтому созданные объекты перечитываются.
+    """
+    rng = random.Random(seed)
+    reviews_per_title = min(reviews_per_title, users)
+    User.objects.bulk_create(
+        User(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(users)
+    )
+    user_objs = list(User.objects.order_by('id'))
+    Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(categories)
+    )
+    category_objs = list(Category.objects.order_by('id'))
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(genres)
+    )
+    genre_objs = list(Genre.objects.order_by('id'))
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {i}',
+            year=rng.randint(1950, 2020),
+            description='Описание произведения.',
+            category=rng.choice(category_objs),
+        )
+        for i in range(titles)
+    )
+    title_objs = list(Title.objects.order_by('id'))
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title.id, genre_id=genre.id)
+        for title in title_objs
+        for genre in rng.sample(
+            genre_objs, min(len(genre_objs), genres_per_title)
+        )
+    )
+    Review.objects.bulk_create(
+        Review(
+            title=title, author=author, score=rng.randint(1, 10),
+            text=REVIEW_TEXT * rng.randint(1, 10)
+        )
+        for title in title_objs
+        for author in rng.sample(user_objs, reviews_per_title)
+    )
+    review_objs = list(Review.objects.order_by('id'))
+    Comment.objects.bulk_create(
+        Comment(
+            review=review, author=rng.choice(user_objs),
+            text=COMMENT_TEXT * rng.randint(1, 5)
+        )
+        for review in review_objs
+        for _ in range(comments_per_review)
+    )
+    ratings.rebuild()
+    leaderboards.rebuild()
+    return title_objs, review_objs, genre_objs, category_objs
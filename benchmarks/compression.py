@@ -0,0 +1,125 @@
+"""
+Сжатие ответов: процессорное время против сэкономленных байт на
+страницах отзывов и комментариев. Каталог строится командой
+generate_data, поэтому тексты и их длины взяты из образцов static/data.
+Для каждой доступной кодировки и уровня — степень сжатия, время
+на страницу и пропускная способность; плюс сквозная задержка запроса
+со сжатием и без:
+    python benchmarks/compression.py --titles 500 --pages 50
+"""
+import argparse
+import io
+import json
+import time
+
+from catalog import Review, Title, test_database
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import Client
+
+from api.compression import COMPRESSORS, compress
+
+LEVELS = {
+    'gzip': (1, 6, 9),
+    'br': (1, 4, 6, 11),
+    'zstd': (1, 3, 9, 19),
+}
+
+
+def titles_by_reviews():
+    return Title.objects.order_by('-reviews_count').values_list(
+        'id', flat=True
+    )
+
+
+def fetch_pages(client, pages):
+    """Тела самых длинных страниц отзывов и комментариев без сжатия."""
+    bodies = []
+    for title_id in titles_by_reviews()[:pages]:
+        response = client.get(f'/api/v1/titles/{title_id}/reviews/')
+        bodies.append(response.content)
+    reviews = Review.objects.annotate(
+        comments_count=Count('comments')
+    ).order_by('-comments_count').values_list('id', 'title_id')[:pages]
+    for review_id, title_id in reviews:
+        response = client.get(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        )
+        bodies.append(response.content)
+    return bodies
+
+
+def measure_codec(encoding, level, bodies, repeat):
+    raw = sum(len(body) for body in bodies)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        compressed = sum(
+            len(compress(encoding, body, level)) for body in bodies
+        )
+    elapsed = (time.perf_counter() - started) / repeat
+    return {
+        'ratio': round(raw / compressed, 2),
+        'saved_bytes_per_page': round((raw - compressed) / len(bodies)),
+        'us_per_page': round(elapsed / len(bodies) * 10 ** 6, 1),
+        'mb_per_s': round(raw / elapsed / 10 ** 6, 1),
+    }
+
+
+def measure_latency(client, url, repeat, **headers):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        response = client.get(url, **headers)
+    elapsed = (time.perf_counter() - started) / repeat
+    return {
+        'ms': round(elapsed * 1000, 3),
+        'bytes': len(response.content),
+        'encoding': response.get('Content-Encoding', 'identity'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--titles', type=int, default=500)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with test_database():
+        call_command(
+            'generate_data', titles=args.titles, users=args.users,
+            seed=args.seed, stdout=io.StringIO()
+        )
+        client = Client()
+        bodies = fetch_pages(client, args.pages)
+        report = {
+            'pages': len(bodies),
+            'avg_page_bytes': round(
+                sum(len(body) for body in bodies) / len(bodies)
+            ),
+            'codecs': {},
+        }
+        for encoding in COMPRESSORS:
+            report['codecs'][encoding] = {
+                str(level): measure_codec(
+                    encoding, level, bodies, args.repeat
+                )
+                for level in LEVELS[encoding]
+            }
+        title_id = titles_by_reviews().first()
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        report['latency'] = {
+            'identity': measure_latency(client, url, args.repeat),
+        }
+        for encoding in COMPRESSORS:
+            report['latency'][encoding] = measure_latency(
+                client, url, args.repeat, HTTP_ACCEPT_ENCODING=encoding
+            )
+        report['config'] = vars(args)
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
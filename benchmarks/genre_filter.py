@@ -0,0 +1,90 @@
+"""
+Фильтр произведений по нескольким жанрам: наивный JOIN по M2M
+с DISTINCT против подзапросов EXISTS из api.filters.TitleFilter.
+Каталог с большим числом жанров на произведение:
+    python benchmarks/genre_filter.py --titles 5000 --genres-per-title 8
+"""
+import argparse
+import json
+import time
+
+from catalog import (
+    Genre, Title, add_size_arguments, seed_catalog, test_database
+)
+
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from api.filters import TitleFilter
+
+
+def measure(queryset, repeat):
+    """Среднее время полного чтения и число строк."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        rows = len(list(queryset.values_list('id', flat=True)))
+    return round((time.perf_counter() - started) / repeat * 1000, 3), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--filter-genres', type=int, default=3)
+    add_size_arguments(parser)
+    parser.set_defaults(
+        titles=2000, genres=30, genres_per_title=8, reviews_per_title=1,
+        comments_per_review=0
+    )
+    args = parser.parse_args()
+
+    with test_database():
+        seed_catalog(
+            titles=args.titles, genres=args.genres,
+            categories=args.categories, users=args.users,
+            reviews_per_title=args.reviews_per_title,
+            comments_per_review=args.comments_per_review, seed=args.seed,
+            genres_per_title=args.genres_per_title
+        )
+        slugs = list(
+            Genre.objects.order_by('id').values_list('slug', flat=True)
+        )[:args.filter_genres]
+        titles = Title.objects.all()
+        variants = {
+            'any_join_distinct': titles.filter(
+                genre__slug__in=slugs
+            ).distinct(),
+            'any_exists': TitleFilter(
+                {'genre': ','.join(slugs)}, queryset=titles
+            ).qs,
+            'all_join_group_by': titles.filter(
+                genre__slug__in=slugs
+            ).annotate(matched=Count('genre')).filter(
+                matched=len(slugs)
+            ),
+            'all_exists': TitleFilter(
+                {'genre': ','.join(slugs), 'genre_match': 'all'},
+                queryset=titles
+            ).qs,
+        }
+        report = {}
+        for name, queryset in variants.items():
+            milliseconds, rows = measure(queryset, args.repeat)
+            report[name] = {'ms': milliseconds, 'rows': rows}
+        client = Client()
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(
+                '/api/v1/titles/', {'genre': ','.join(slugs)}
+            )
+        report['api_any'] = {
+            'status': response.status_code,
+            'count': response.json()['count'],
+            'queries': len(captured),
+        }
+        report['config'] = vars(args)
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
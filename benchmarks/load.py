@@ -0,0 +1,196 @@
+"""
+Нагрузочный бенчмарк API: смешанная нагрузка через WSGI-клиент
+на настоящем URLconf. Результат печатается в JSON, чтобы сравнивать
+коммиты между собой:
+    python benchmarks/load.py --requests 2000 --output before.json
+"""
+import argparse
+import json
+import random
+import time
+from collections import defaultdict
+
+from catalog import (
+    COMMENT_TEXT, REVIEW_TEXT, User, add_size_arguments, seed_catalog,
+    test_database
+)
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+# Доля каждого сценария в смешанной нагрузке.
+WORKLOAD = (
+    ('titles-list', 25),
+    ('titles-filter', 15),
+    ('title-retrieve', 20),
+    ('reviews-list', 15),
+    ('comments-list', 10),
+    ('review-post', 5),
+    ('comment-post', 10),
+)
+
+
+def percentile(sorted_values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Workload:
+    """Генератор запросов смешанной нагрузки."""
+
+    def __init__(self, rng, titles, reviews, genres, categories, writers):
+        self.rng = rng
+        self.titles = titles
+        self.reviews = reviews
+        self.genres = genres
+        self.categories = categories
+        self.writers = writers
+        self.names, self.weights = zip(*WORKLOAD)
+
+    def next(self):
+        name = self.rng.choices(self.names, self.weights)[0]
+        return (name,) + getattr(self, name.replace('-', '_'))()
+
+    def titles_list(self):
+        page = self.rng.randint(1, 5)
+        return 'get', f'/api/v1/titles/?page={page}', None, None
+
+    def titles_filter(self):
+        params = self.rng.choice((
+            f'genre={self.rng.choice(self.genres).slug}',
+            f'category={self.rng.choice(self.categories).slug}',
+            f'year={self.rng.choice(self.titles).year}',
+            'name=1',
+        ))
+        return 'get', f'/api/v1/titles/?{params}', None, None
+
+    def title_retrieve(self):
+        title = self.rng.choice(self.titles)
+        return 'get', f'/api/v1/titles/{title.id}/', None, None
+
+    def reviews_list(self):
+        title = self.rng.choice(self.titles)
+        return 'get', f'/api/v1/titles/{title.id}/reviews/', None, None
+
+    def comments_list(self):
+        review = self.rng.choice(self.reviews)
+        return (
+            'get',
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+            'comments/',
+            None, None
+        )
+
+    def review_post(self):
+        # Каждый автор пишет отзыв на каждое произведение не больше раза.
+        writer, token = self.writers[self.rng.randrange(len(self.writers))]
+        title = self.titles[writer.next_title % len(self.titles)]
+        writer.next_title += 1
+        return (
+            'post', f'/api/v1/titles/{title.id}/reviews/',
+            {'text': REVIEW_TEXT, 'score': self.rng.randint(1, 10)}, token
+        )
+
+    def comment_post(self):
+        review = self.rng.choice(self.reviews)
+        _, token = self.rng.choice(self.writers)
+        return (
+            'post',
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+            'comments/',
+            {'text': COMMENT_TEXT}, token
+        )
+
+
+def create_writers(count):
+    User.objects.bulk_create(
+        User(username=f'writer{i}', email=f'writer{i}@yamdb.fake')
+        for i in range(count)
+    )
+    writers = []
+    for writer in User.objects.filter(username__startswith='writer'):
+        writer.next_title = 0
+        writers.append((writer, f'Bearer {AccessToken.for_user(writer)}'))
+    return writers
+
+
+def run(workload, total, warmup):
+    client = Client()
+    latencies = defaultdict(list)
+    queries = defaultdict(int)
+    errors = defaultdict(int)
+    started = time.perf_counter()
+    for index in range(warmup + total):
+        name, method, url, data, token = workload.next()
+        extra = {'HTTP_AUTHORIZATION': token} if token else {}
+        with CaptureQueriesContext(connection) as captured:
+            request_started = time.perf_counter()
+            response = getattr(client, method)(url, data=data, **extra)
+            elapsed = time.perf_counter() - request_started
+        if index < warmup:
+            started = time.perf_counter()
+            continue
+        latencies[name].append(elapsed)
+        queries[name] += len(captured)
+        if response.status_code >= 400:
+            errors[name] += 1
+    duration = time.perf_counter() - started
+
+    endpoints = {}
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        endpoints[name] = {
+            'requests': len(values),
+            'errors': errors[name],
+            'mean_latency_ms': round(sum(values) / len(values) * 1000, 2),
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'queries_per_request': round(queries[name] / len(values), 2),
+        }
+    return {
+        'requests': total,
+        'requests_per_second': round(total / duration, 1),
+        'endpoints': endpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--writers', type=int, default=20)
+    parser.add_argument('--output', help='файл для JSON-отчета')
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    with test_database():
+        titles, reviews, genres, categories = seed_catalog(
+            titles=args.titles, genres=args.genres,
+            categories=args.categories, users=args.users,
+            reviews_per_title=args.reviews_per_title,
+            comments_per_review=args.comments_per_review, seed=args.seed,
+            genres_per_title=args.genres_per_title
+        )
+        workload = Workload(
+            random.Random(args.seed), titles, reviews, genres, categories,
+            create_writers(args.writers)
+        )
+        report = run(workload, args.requests, args.warmup)
+    report['config'] = {
+        key: value for key, value in vars(args).items() if key != 'output'
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
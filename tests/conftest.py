@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,4 +33,44 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_queries',
 ]
+
+# Отдельная база, которая в тестах играет роль реплики. Она создается
+# пустой и не зеркалирует основную, поэтому по данным видно, из какой
+# базы прочитан ответ. Чтения идут в нее, только если тест включил ее
+# в DATABASE_REPLICAS, см. tests/test_08_replica_routing.py.
+TEST_REPLICA = 'test_replica'
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    from django.db import connections
+    connections.databases.setdefault(TEST_REPLICA, {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    })
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    # Тесты идут в одном процессе, поэтому кеш держится в его памяти
+    # и не добавляет SQL-запросов к бюджетам, см. fixture_queries.
+    # Кеш хранит корзины троттлинга и не должен переживать тест,
+    # как и процессный кэш справочников: база очищается без сигналов.
+    from django.core.cache import cache
+    settings.CACHES = {'default': settings.CACHE_BACKENDS['locmem']}
+    from reviews.lookups import LOOKUPS
+    cache.clear()
+    for lookup in LOOKUPS.values():
+        lookup.clear()
+
+
+@pytest.fixture(autouse=True)
+def detect_n_plus_one(settings):
+    # Запрос к API с N+1 SQL-запросами роняет тест, см. api.nplusone.
+    # В тестах объектов два-три, поэтому поле сериализатора не должно
+    # загружать связь больше одного раза.
+    settings.NPLUSONE_ENABLED = True
+    settings.NPLUSONE_RAISE = True
+    settings.NPLUSONE_LAZY_LOAD_THRESHOLD = 1
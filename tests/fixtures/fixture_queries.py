@@ -0,0 +1,52 @@
+import pytest
+
+# Максимум SQL-запросов на запрос к эндпоинту, включая загрузку
+# пользователя по JWT. Не должен зависеть от числа объектов в ответе.
+# Удаление включает ограниченные подсчеты потомков, см. reviews.purge;
+# изменения произведений, отзывов и комментариев — запись в журнал
+# изменений и выдачу ей номера, см. reviews.changelog.
+QUERY_BUDGETS = {
+    ('titles', 'list'): 4,
+    ('titles', 'retrieve'): 3,
+    ('titles', 'create'): 15,
+    ('titles', 'patch'): 15,
+    ('titles', 'delete'): 17,
+    ('titles', 'top'): 5,
+    ('titles', 'batch'): 3,
+    ('reviews', 'list'): 4,
+    ('reviews', 'retrieve'): 3,
+    ('reviews', 'create'): 16,
+    ('reviews', 'patch'): 13,
+    ('reviews', 'delete'): 16,
+    ('reviews', 'batch'): 3,
+    ('comments', 'list'): 4,
+    ('comments', 'retrieve'): 3,
+    ('comments', 'create'): 9,
+    ('comments', 'patch'): 10,
+    ('comments', 'delete'): 10,
+    ('users', 'list'): 3,
+    ('users', 'retrieve'): 2,
+    ('users', 'create'): 4,
+    ('users', 'patch'): 3,
+    ('users', 'delete'): 28,
+    ('genres', 'list'): 3,
+    ('genres', 'create'): 3,
+    ('genres', 'delete'): 5,
+    ('categories', 'list'): 3,
+    ('categories', 'create'): 3,
+    ('categories', 'delete'): 6,
+}
+
+
+@pytest.fixture
+def query_budget(django_assert_max_num_queries):
+    """
+    Контекстный менеджер, проверяющий бюджет запросов эндпоинта:
+        with query_budget('titles', 'list'):
+            client.get('/api/v1/titles/')
+    """
+
+    def check(resource, action):
+        return django_assert_max_num_queries(QUERY_BUDGETS[resource, action])
+
+    return check
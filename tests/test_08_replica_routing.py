@@ -0,0 +1,123 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+
+from api.db_routers import ReplicaRouter, read_from_replica
+from api.middleware import REPLICA_PIN_KEY
+from reviews.models import Title
+from tests.conftest import TEST_REPLICA
+from tests.utils import asgi_get, create_titles
+
+
+class Test08ReplicaRouter:
+
+    def test_01_reads_go_to_primary_by_default(self, settings):
+        settings.DATABASE_REPLICAS = ['replica']
+        router = ReplicaRouter()
+        assert router.db_for_read(Title) == 'default', (
+            'Вне `read_from_replica()` чтение должно идти в основную базу.'
+        )
+        with read_from_replica():
+            assert router.db_for_read(Title) == 'replica', (
+                'Внутри `read_from_replica()` чтение должно идти на реплику.'
+            )
+            assert router.db_for_write(Title) == 'default', (
+                'Запись всегда должна идти в основную базу.'
+            )
+
+    def test_02_no_replicas_configured(self, settings):
+        settings.DATABASE_REPLICAS = []
+        with read_from_replica():
+            assert ReplicaRouter().db_for_read(Title) == 'default', (
+                'Без настроенных реплик чтение должно идти в основную базу.'
+            )
+
+    def test_03_cache_table_reads_primary(self, settings):
+        settings.DATABASE_REPLICAS = ['replica']
+        cache_model = DatabaseCache('yamdb_cache', {}).cache_model_class
+        with read_from_replica():
+            assert ReplicaRouter().db_for_read(cache_model) == 'default', (
+                'Общий кеш в базе должен читаться из основной базы.'
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08SharedCache:
+
+    def test_01_database_cache_table(self, settings):
+        settings.CACHES = {'default': settings.CACHE_BACKENDS['database']}
+        cache.set('shared', 1)
+        assert cache.get('shared') == 1, (
+            'Таблица кеша должна создаваться вместе с тестовой базой.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08ReadYourWrites:
+
+    def test_01_write_pins_user_to_primary(self, admin_client, user_client,
+                                           user):
+        cache.clear()
+        titles, _, _ = create_titles(admin_client)
+        pin_key = REPLICA_PIN_KEY.format(user_id=user.id)
+        assert not cache.get(pin_key)
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'text', 'score': 5}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert cache.get(pin_key), (
+            'После записи пользователь должен читать из основной базы.'
+        )
+
+
+@pytest.mark.django_db(
+    transaction=True, databases=['default', TEST_REPLICA]
+)
+class Test08ReplicaEndToEnd:
+
+    @pytest.fixture(autouse=True)
+    def route_reads_to_replica(self, settings):
+        settings.DATABASE_REPLICAS = [TEST_REPLICA]
+
+    def test_01_get_reads_from_replica(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert Title.objects.using('default').count() == len(titles)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 0, (
+            'GET-запрос к вьюсету с `use_read_replica` должен читать '
+            'с реплики, куда записи еще не дошли.'
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_pinned_user_reads_from_primary(self, client, admin_client,
+                                                user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(url, data={'text': 'text', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1, (
+            'После записи пользователь должен читать из основной базы.'
+        )
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Остальные клиенты по-прежнему читают с реплики.'
+        )
+
+    def test_03_asgi(self, admin_client, user_client, token_user):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        assert asgi_get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Под ASGI GET-запрос тоже должен читать с реплики.'
+        )
+        user_client.post(url, data={'text': 'text', 'score': 5})
+        response = asgi_get(
+            url, authorization=f'Bearer {token_user["access"]}'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1
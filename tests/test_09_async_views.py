@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import SyncToAsync
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.base import BaseHandler
+
+from api.metrics import registry
+from tests.utils import asgi_get, create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09AsyncReadViews:
+
+    def test_01_async_matches_sync(self, client, admin_client, admin,
+                                   user_client, user):
+        authors_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, authors_map)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title_id}/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            f'{comments[0]["id"]}/',
+        )
+        for url in urls:
+            async_url = url.replace('/api/v1/', '/api/v1/async/')
+            response = client.get(async_url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'GET-запрос к `{async_url}` должен возвращать статус 200.'
+            )
+            expected = client.get(url).json()
+            assert response.json() == expected, (
+                f'Ответ `{async_url}` должен совпадать по формату с `{url}`.'
+            )
+
+    def test_02_async_not_found_and_write(self, client):
+        response = client.get('/api/v1/async/titles/999/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.post('/api/v1/async/titles/')
+        assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
+
+    def test_03_asgi_chain_not_adapted(self, settings, monkeypatch):
+        settings.METRICS_ENABLED = True
+        settings.PROFILER_ENABLED = True
+        settings.SLOW_QUERY_LOG_ENABLED = True
+        adapted = []
+        adapt_method_mode = BaseHandler.adapt_method_mode
+
+        def spy(self, is_async, method, *args, **kwargs):
+            # Хуки встроенных middleware Django адаптирует сама Django.
+            result = adapt_method_mode(self, is_async, method, *args, **kwargs)
+            owner = getattr(method, '__self__', None)
+            if result is not method and (
+                kwargs.get('name')
+                or type(owner).__module__.startswith('api.')
+            ):
+                adapted.append(kwargs.get('name') or method)
+            return result
+
+        monkeypatch.setattr(BaseHandler, 'adapt_method_mode', spy)
+        handler = ASGIHandler()
+        assert not isinstance(handler._middleware_chain, SyncToAsync)
+        assert adapted == [], (
+            'Под ASGI цепочка middleware должна оставаться асинхронной, '
+            f'без перехода в поток: адаптированы {adapted}.'
+        )
+
+    def test_04_asgi_metrics_and_profile(self, admin_client, token_admin):
+        create_titles(admin_client)
+        registry.clear()
+        response = asgi_get('/api/v1/async/titles/')
+        assert response.status_code == HTTPStatus.OK
+        (histograms,) = registry.routes.values()
+        assert histograms[0].sum > 0, (
+            'Запросы к базе из потока sync_to_async должны попадать '
+            'в метрики.'
+        )
+        response = asgi_get(
+            '/api/v1/async/titles/?profile=1',
+            authorization=f'Bearer {token_admin["access"]}'
+        )
+        assert response.status_code == HTTPStatus.OK
+        report = admin_client.get(response['X-Profile-URL']).json()
+        assert report['query_count'] > 0
+        assert report['serializer_ms'] > 0, (
+            'Профилировщик должен видеть сериализацию async-вью.'
+        )
@@ -0,0 +1,118 @@
+import threading
+import time
+import warnings
+from http import HTTPStatus
+
+import pytest
+from django.core.cache.backends.base import CacheKeyWarning
+from django.test import RequestFactory
+
+from api.throttling import SignupIPThrottle
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10AuthThrottling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def test_01_token_bruteforce_throttled(self, client):
+        client.post(
+            self.URL_SIGNUP,
+            data={'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        )
+        data = {'username': 'valid_username', 'confirmation_code': 'wrong'}
+        for _ in range(5):
+            response = client.post(self.URL_TOKEN, data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Перебор `confirmation_code` на `{self.URL_TOKEN}` для одного '
+            '`username` должен ограничиваться со статусом 429.'
+        )
+        assert 'Retry-After' in response, (
+            'Ответ со статусом 429 должен содержать заголовок `Retry-After`.'
+        )
+        response = client.post(
+            self.URL_TOKEN,
+            data={'username': 'other_user', 'confirmation_code': 'wrong'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Ограничение по `username` не должно влиять на других '
+            'пользователей.'
+        )
+
+    def test_02_signup_flood_throttled(self, client):
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        for _ in range(5):
+            response = client.post(self.URL_SIGNUP, data=data)
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Повторная отправка кода через `{self.URL_SIGNUP}` должна '
+            'ограничиваться со статусом 429.'
+        )
+
+    def test_03_forwarded_for_does_not_reset_ip_bucket(self, client,
+                                                       monkeypatch):
+        monkeypatch.setattr(
+            SignupIPThrottle, 'rate', '2/hour', raising=False
+        )
+        for number in range(3):
+            response = client.post(
+                self.URL_SIGNUP,
+                data={
+                    'email': f'user{number}@yamdb.fake',
+                    'username': f'user{number}',
+                },
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{number}'
+            )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Заголовок X-Forwarded-For клиента не должен обходить '
+            'ограничение по IP.'
+        )
+
+    def test_04_username_cache_key_is_safe(self, client):
+        data = {'username': 'имя с пробелами\n' * 20, 'confirmation_code': 'x'}
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code != HTTPStatus.INTERNAL_SERVER_ERROR, (
+            'Ключ кеша не должен содержать имя пользователя как есть.'
+        )
+
+    def test_05_bucket_update_is_atomic(self, monkeypatch):
+        class SlowCache:
+            """Кеш, в котором между чтением и записью проходит время."""
+
+            def __init__(self, cache):
+                self.cache = cache
+
+            def __getattr__(self, name):
+                return getattr(self.cache, name)
+
+            def get(self, *args, **kwargs):
+                value = self.cache.get(*args, **kwargs)
+                time.sleep(0.01)
+                return value
+
+        monkeypatch.setattr(
+            SignupIPThrottle, 'cache', SlowCache(SignupIPThrottle.cache)
+        )
+        monkeypatch.setattr(
+            SignupIPThrottle, 'rate', '5/hour', raising=False
+        )
+        request = RequestFactory().post(self.URL_SIGNUP)
+        allowed = []
+
+        def attempt():
+            allowed.append(SignupIPThrottle().allow_request(request, None))
+
+        threads = [threading.Thread(target=attempt) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert allowed.count(True) == 5, (
+            'Одновременные запросы не должны тратить один токен дважды.'
+        )
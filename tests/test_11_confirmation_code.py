@@ -0,0 +1,79 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ConfirmationCode:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    SIGNUP_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+    def signup(self, client):
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        return mail.outbox[-1].body.rsplit(' ', 1)[-1]
+
+    def test_01_code_is_hashed_and_single_use(self, client,
+                                               django_user_model):
+        code = self.signup(client)
+        user = django_user_model.objects.get(
+            username=self.SIGNUP_DATA['username']
+        )
+        assert user.confirmation_code != code, (
+            'Код подтверждения не должен храниться открытым текстом.'
+        )
+        data = {'username': user.username, 'confirmation_code': code}
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.OK
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Код подтверждения должен удаляться после успешного '
+            'получения токена.'
+        )
+
+    def test_02_resend_replaces_code(self, client):
+        old_code = self.signup(client)
+        new_code = self.signup(client)
+        username = self.SIGNUP_DATA['username']
+        response = client.post(
+            self.URL_TOKEN,
+            data={'username': username, 'confirmation_code': new_code}
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Повторная регистрация должна выдавать новый рабочий код.'
+        )
+        if old_code != new_code:
+            response = client.post(
+                self.URL_TOKEN,
+                data={'username': username, 'confirmation_code': old_code}
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_expired_code(self, client, django_user_model):
+        code = self.signup(client)
+        users = django_user_model.objects.filter(
+            username=self.SIGNUP_DATA['username']
+        )
+        users.update(
+            confirmation_code_expires=timezone.now() - timedelta(seconds=1)
+        )
+        response = client.post(
+            self.URL_TOKEN,
+            data={
+                'username': self.SIGNUP_DATA['username'],
+                'confirmation_code': code
+            }
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Просроченный код подтверждения не должен приниматься.'
+        )
+        call_command('clear_confirmation_codes', stdout=None)
+        assert users.get().confirmation_code is None, (
+            'Команда `clear_confirmation_codes` должна удалять '
+            'просроченные коды.'
+        )
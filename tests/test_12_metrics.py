@@ -0,0 +1,63 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+from api.metrics import METRICS, registry
+from api.serializers import TitleSerializer
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Metrics:
+
+    METRICS_URL = '/api/v1/metrics/'
+
+    def test_01_metrics_admin_only(self, client, user_client):
+        assert client.get(self.METRICS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        assert user_client.get(self.METRICS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), f'Эндпоинт `{self.METRICS_URL}` доступен только администратору.'
+
+    def test_02_metrics_prometheus_format(self, client, admin_client):
+        registry.clear()
+        client.get('/api/v1/titles/')
+        response = admin_client.get(self.METRICS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        for name in (
+            'yamdb_request_queries', 'yamdb_request_db_seconds',
+            'yamdb_request_serialize_seconds', 'yamdb_request_seconds'
+        ):
+            assert f'# TYPE {name} histogram' in body
+        assert (
+            'yamdb_request_queries_count{method="GET",view="title-list"} 1'
+            in body
+        ), 'Метрики должны собираться по каждому эндпоинту.'
+
+    def test_03_serializer_time_is_counted(self, monkeypatch, client,
+                                           admin_client):
+        create_titles(admin_client)
+        to_representation = TitleSerializer.to_representation
+
+        def slow_to_representation(self, instance):
+            time.sleep(0.05)
+            return to_representation(self, instance)
+
+        monkeypatch.setattr(
+            TitleSerializer, 'to_representation', slow_to_representation
+        )
+        registry.clear()
+        client.get('/api/v1/titles/')
+        serialize = registry.routes['GET', 'title-list'][
+            [name for name, _, _ in METRICS].index(
+                'yamdb_request_serialize_seconds'
+            )
+        ]
+        assert serialize.sum >= 0.1, (
+            'Время сериализации должно включать вычисление `.data`, '
+            'а не только рендеринг.'
+        )
@@ -0,0 +1,77 @@
+import pytest
+
+from tests.fixtures.fixture_queries import QUERY_BUDGETS
+from tests.utils import create_comments
+
+TITLE = '/api/v1/titles/{title}/'
+REVIEW = TITLE + 'reviews/{review}/'
+COMMENT = REVIEW + 'comments/{comment}/'
+
+ENDPOINTS = (
+    ('titles', 'list', 'get', '/api/v1/titles/', None),
+    ('titles', 'retrieve', 'get', TITLE, None),
+    ('titles', 'create', 'post', '/api/v1/titles/', {
+        'name': 'Чужой', 'year': 1979, 'genre': ['horror', 'drama'],
+        'category': 'films'
+    }),
+    ('titles', 'patch', 'patch', TITLE, {'name': 'Чужие'}),
+    ('titles', 'delete', 'delete', TITLE, None),
+    ('titles', 'top', 'get', '/api/v1/titles/top/?genre=horror', None),
+    ('titles', 'batch', 'get',
+     '/api/v1/titles/batch/?ids={other_title},{title},0', None),
+    ('reviews', 'list', 'get', TITLE + 'reviews/', None),
+    ('reviews', 'retrieve', 'get', REVIEW, None),
+    ('reviews', 'create', 'post', '/api/v1/titles/{other_title}/reviews/',
+     {'text': 'Отзыв', 'score': 7}),
+    ('reviews', 'patch', 'patch', REVIEW, {'text': 'Отзыв'}),
+    ('reviews', 'delete', 'delete', REVIEW, None),
+    ('reviews', 'batch', 'get', TITLE + 'reviews/batch/?ids={review},0',
+     None),
+    ('comments', 'list', 'get', REVIEW + 'comments/', None),
+    ('comments', 'retrieve', 'get', COMMENT, None),
+    ('comments', 'create', 'post', REVIEW + 'comments/',
+     {'text': 'Комментарий'}),
+    ('comments', 'patch', 'patch', COMMENT, {'text': 'Комментарий'}),
+    ('comments', 'delete', 'delete', COMMENT, None),
+    ('users', 'list', 'get', '/api/v1/users/', None),
+    ('users', 'retrieve', 'get', '/api/v1/users/TestUser/', None),
+    ('users', 'create', 'post', '/api/v1/users/',
+     {'username': 'new_user', 'email': 'new_user@yamdb.fake'}),
+    ('users', 'patch', 'patch', '/api/v1/users/TestUser/', {'bio': 'Био'}),
+    ('users', 'delete', 'delete', '/api/v1/users/TestUser/', None),
+    ('genres', 'list', 'get', '/api/v1/genres/', None),
+    ('genres', 'create', 'post', '/api/v1/genres/',
+     {'name': 'Вестерн', 'slug': 'western'}),
+    ('genres', 'delete', 'delete', '/api/v1/genres/horror/', None),
+    ('categories', 'list', 'get', '/api/v1/categories/', None),
+    ('categories', 'create', 'post', '/api/v1/categories/',
+     {'name': 'Музыка', 'slug': 'music'}),
+    ('categories', 'delete', 'delete', '/api/v1/categories/films/', None),
+)
+
+
+def test_00_every_endpoint_has_budget():
+    assert {endpoint[:2] for endpoint in ENDPOINTS} == set(QUERY_BUDGETS)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize(
+    'resource,action,method,url,data', ENDPOINTS,
+    ids=[f'{endpoint[0]}-{endpoint[1]}' for endpoint in ENDPOINTS]
+)
+def test_01_query_budget(resource, action, method, url, data, query_budget,
+                         admin_client, admin, user_client, user,
+                         moderator_client, moderator):
+    authors_map = {
+        admin: admin_client, user: user_client, moderator: moderator_client
+    }
+    comments, reviews, titles = create_comments(admin_client, authors_map)
+    url = url.format(
+        title=titles[0]['id'], other_title=titles[1]['id'],
+        review=reviews[0]['id'], comment=comments[0]['id']
+    )
+    with query_budget(resource, action):
+        response = getattr(admin_client, method)(url, data=data, format='json')
+    assert response.status_code < 400, (
+        f'{method.upper()}-запрос к `{url}` вернул {response.status_code}.'
+    )
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews import leaderboards
+from reviews.models import LeaderboardEntry, Review
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Leaderboards:
+
+    TOP_URL = '/api/v1/titles/top/'
+
+    def create_data(self, admin_client, user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'текст', 3)
+        create_single_review(moderator_client, titles[0]['id'], 'текст', 5)
+        create_single_review(user_client, titles[1]['id'], 'текст', 9)
+        return titles
+
+    def test_01_top_by_rating(self, client, admin_client, user_client,
+                              moderator_client):
+        titles = self.create_data(
+            admin_client, user_client, moderator_client
+        )
+        response = client.get(self.TOP_URL)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [item['id'] for item in data] == [
+            titles[1]['id'], titles[0]['id']
+        ], f'`{self.TOP_URL}` должен сортировать произведения по рейтингу.'
+        assert data[0]['score'] == 9 and data[0]['rating'] == 9
+
+        response = client.get(
+            self.TOP_URL, {'category': titles[0]['category'], 'limit': 1}
+        )
+        assert [item['id'] for item in response.json()] == [titles[0]['id']]
+        response = client.get(self.TOP_URL, {'genre': titles[1]['genre'][0]})
+        assert [item['id'] for item in response.json()] == [titles[1]['id']]
+
+    def test_02_top_by_trending(self, client, admin_client, user_client,
+                                moderator_client):
+        titles = self.create_data(
+            admin_client, user_client, moderator_client
+        )
+        # Два старых отзыва весят меньше одного свежего.
+        Review.objects.filter(title_id=titles[0]['id']).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        call_command('rebuild_leaderboards', stdout=None)
+        response = client.get(self.TOP_URL, {'by': 'trending'})
+        assert [item['id'] for item in response.json()] == [
+            titles[1]['id'], titles[0]['id']
+        ], 'Популярность должна учитывать давность отзывов.'
+
+    def test_03_refresh_matches_rebuild(self, admin_client, user_client,
+                                        moderator_client):
+        self.create_data(admin_client, user_client, moderator_client)
+        incremental = set(
+            LeaderboardEntry.objects.values_list('board', 'title_id')
+        )
+        leaderboards.rebuild()
+        assert incremental == set(
+            LeaderboardEntry.objects.values_list('board', 'title_id')
+        ), 'Инкрементальный пересчет должен совпадать с полным.'
+
+    def test_04_bad_params(self, client):
+        assert client.get(
+            self.TOP_URL, {'by': 'unknown'}
+        ).status_code == HTTPStatus.BAD_REQUEST
+        assert client.get(
+            self.TOP_URL, {'limit': 'many'}
+        ).status_code == HTTPStatus.BAD_REQUEST
+        assert client.get(
+            self.TOP_URL, {'category': 'films', 'genre': 'drama'}
+        ).status_code == HTTPStatus.BAD_REQUEST, (
+            'Рейтинга по категории и жанру сразу нет, это ошибка запроса.'
+        )
+
+    def test_05_incremental_scores_match_rebuild(self, admin_client,
+                                                 user_client,
+                                                 moderator_client):
+        titles = self.create_data(
+            admin_client, user_client, moderator_client
+        )
+        reviews = Review.objects.filter(title_id=titles[0]['id'])
+        review = reviews.get(score=3)
+        user_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review.pk}/',
+            data={'score': 7}, content_type='application/json'
+        )
+        user_client.delete(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+            f'{Review.objects.get(title_id=titles[1]["id"]).pk}/'
+        )
+        incremental = dict(
+            ((board, title_id), score) for board, title_id, score in
+            LeaderboardEntry.objects.values_list('board', 'title_id', 'score')
+        )
+        leaderboards.rebuild()
+        rebuilt = dict(
+            ((board, title_id), score) for board, title_id, score in
+            LeaderboardEntry.objects.values_list('board', 'title_id', 'score')
+        )
+        assert incremental.keys() == rebuilt.keys()
+        assert all(
+            incremental[key] == pytest.approx(score)
+            for key, score in rebuilt.items()
+        ), 'Очки после записи отзывов должны совпадать с полным пересчетом.'
+
+    def test_06_trending_is_incremental(self, admin_client, user_client,
+                                        moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'текст', 3)
+        with CaptureQueriesContext(connection) as context:
+            create_single_review(moderator_client, titles[0]['id'], 'x', 5)
+        pub_dates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT "reviews_review"."pub_date"')
+        ]
+        assert not pub_dates, (
+            'Популярность не должна пересчитываться по всем отзывам.'
+        )
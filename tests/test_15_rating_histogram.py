@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import Client
+
+from reviews import ratings
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15RatingHistogram:
+
+    def test_01_histogram_follows_review_writes(self, client, admin_client,
+                                                user_client,
+                                                moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/'
+        create_single_review(user_client, title_id, 'текст', 4)
+        review = create_single_review(
+            moderator_client, title_id, 'текст', 10
+        ).json()
+
+        data = client.get(url).json()
+        assert data['rating'] == 7, (
+            'Рейтинг должен выводиться из гистограммы оценок.'
+        )
+        assert data['scores'] == {
+            str(score): int(score in (4, 10)) for score in range(1, 11)
+        }, f'Ответ на GET-запрос к `{url}` должен содержать `scores`.'
+
+        review_url = f'{url}reviews/{review["id"]}/'
+        moderator_client.patch(review_url, data={'score': 2})
+        data = client.get(url).json()
+        assert data['rating'] == 3
+        assert data['scores']['10'] == 0 and data['scores']['2'] == 1
+
+        response = moderator_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        data = client.get(url).json()
+        assert data['rating'] == 4 and sum(data['scores'].values()) == 1
+
+    def test_02_rebuild_matches_incremental(self, admin_client, user_client,
+                                            moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'текст', 4)
+        create_single_review(moderator_client, titles[0]['id'], 'текст', 9)
+        fields = ratings.SCORE_FIELDS + ('rating',)
+        incremental = list(Title.objects.order_by('id').values(*fields))
+        ratings.rebuild()
+        assert incremental == list(
+            Title.objects.order_by('id').values(*fields)
+        ), 'Полный пересчет гистограмм должен совпадать с инкрементальным.'
+
+    def test_03_deleting_user_forgets_scores(self, client, admin_client,
+                                             user_client, moderator_client,
+                                             user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'текст', 2)
+        create_single_review(moderator_client, title_id, 'текст', 8)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+        data = client.get(f'/api/v1/titles/{title_id}/').json()
+        assert (data['rating'], data['scores']['2']) == (8, 0), (
+            'Оценки отзывов удаленного пользователя должны убираться '
+            'из гистограммы.'
+        )
+        title = Title.objects.get(pk=title_id)
+        assert title.reviews_count == 1
+        top = client.get('/api/v1/titles/top/').json()
+        assert [
+            item['score'] for item in top if item['id'] == title_id
+        ] == [8], 'Рейтинги должны обновляться после удаления пользователя.'
+
+    def test_04_admin_review_delete(self, client, admin_client, user_client,
+                                    moderator_client, user_superuser):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            user_client, title_id, 'текст', 2
+        ).json()
+        create_single_review(moderator_client, title_id, 'текст', 8)
+        site_client = Client()
+        site_client.force_login(user_superuser)
+        response = site_client.post(
+            f'/admin/reviews/review/{review["id"]}/delete/', {'post': 'yes'}
+        )
+        assert response.status_code == HTTPStatus.FOUND
+        data = client.get(f'/api/v1/titles/{title_id}/').json()
+        assert (data['rating'], sum(data['scores'].values())) == (8, 1), (
+            'Удаление отзыва в админке должно обновлять гистограмму.'
+        )
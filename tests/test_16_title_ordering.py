@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+
+from api.filters import title_ordering
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def ids(self, client, ordering=None):
+        params = {'ordering': ordering} if ordering else {}
+        response = client.get(self.TITLES_URL, params)
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_ordering(self, client, admin_client, user_client,
+                         moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        unrated = admin_client.post(self.TITLES_URL, data={
+            'name': 'Без оценок', 'year': 2000, 'genre': ['drama'],
+            'category': 'films'
+        }).json()['id']
+        first, second = titles[0]['id'], titles[1]['id']
+        create_single_review(user_client, first, 'текст', 3)
+        create_single_review(moderator_client, first, 'текст', 5)
+        create_single_review(user_client, second, 'текст', 9)
+
+        assert self.ids(client) == [second, first, unrated], (
+            'По умолчанию произведения сортируются по убыванию рейтинга, '
+            'произведения без оценок — в конце.'
+        )
+        assert self.ids(client, 'rating') == [first, second, unrated]
+        assert self.ids(client, '-reviews_count') == [first, second, unrated]
+        assert self.ids(client, 'year') == [first, second, unrated]
+        assert self.ids(client, '-id') == [unrated, second, first]
+        assert self.ids(client, 'description') == self.ids(client), (
+            'Сортировка по полям вне белого списка должна игнорироваться.'
+        )
+
+    @pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='план запроса SQLite'
+    )
+    @pytest.mark.parametrize(
+        'ordering', ('-rating', 'rating', 'year', '-name', 'reviews_count')
+    )
+    def test_02_ordering_uses_index(self, ordering):
+        plan = Title.objects.order_by(
+            *title_ordering((ordering,))
+        )[:5].explain()
+        assert 'USING INDEX' in plan and 'TEMP B-TREE' not in plan, (
+            f'Сортировка `{ordering}` должна идти по индексу: {plan}'
+        )
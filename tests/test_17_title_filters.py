@@ -0,0 +1,75 @@
+import pytest
+from django.db import connection
+
+from api.filters import TitleFilter
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def ids(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        data = response.json()
+        ids = [title['id'] for title in data['results']]
+        assert data['count'] == len(ids) == len(set(ids)), (
+            'Фильтр по нескольким значениям не должен давать дубли.'
+        )
+        return set(ids)
+
+    def test_01_multiple_genres(self, client, admin_client):
+        # Терминатор: horror, comedy; Крепкий орешек: drama.
+        titles, _, _ = create_titles(admin_client)
+        terminator, die_hard = titles[0]['id'], titles[1]['id']
+        assert self.ids(client, genre='horror,comedy') == {terminator}
+        assert self.ids(client, genre='horror,drama') == {
+            terminator, die_hard
+        }, 'По умолчанию достаточно совпадения хотя бы одного жанра.'
+        assert self.ids(
+            client, genre='horror,comedy', genre_match='all'
+        ) == {terminator}
+        assert self.ids(
+            client, genre='horror,drama', genre_match='all'
+        ) == set(), '`genre_match=all` требует наличия всех жанров.'
+        assert self.ids(client, genre='drama') == {die_hard}
+
+    def test_02_multiple_categories(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.ids(client, category='films,books') == {
+            title['id'] for title in titles
+        }
+        assert self.ids(client, category='books') == {titles[1]['id']}
+        assert self.ids(client, category='unknown') == set()
+
+    def test_03_year_and_rating_ranges(self, client, admin_client,
+                                       user_client):
+        # Терминатор — 1984, Крепкий орешек — 1988.
+        titles, _, _ = create_titles(admin_client)
+        terminator, die_hard = titles[0]['id'], titles[1]['id']
+        create_single_review(user_client, terminator, 'текст', 4)
+        create_single_review(user_client, die_hard, 'текст', 8)
+        assert self.ids(client, year_min=1985) == {die_hard}
+        assert self.ids(client, year_max=1985) == {terminator}
+        assert self.ids(client, year_min=1984, year_max=1988) == {
+            terminator, die_hard
+        }
+        assert self.ids(client, rating_min=5) == {die_hard}
+        assert self.ids(client, rating_max=5) == {terminator}
+        assert self.ids(client, rating_min=4.5, rating_max=7.5) == set()
+
+    @pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='план запроса SQLite'
+    )
+    @pytest.mark.parametrize('params,ordering', (
+        ({'rating_min': 5, 'rating_max': 8}, ('-rating', '-id')),
+        ({'year_min': 1980}, ('year', 'id')),
+    ))
+    def test_04_ranges_use_index(self, params, ordering):
+        queryset = Title.objects.order_by(*ordering)
+        plan = TitleFilter(params, queryset=queryset).qs.explain()
+        assert 'SEARCH' in plan and 'INDEX' in plan, (
+            f'Фильтр {params} должен идти по индексу: {plan}'
+        )
@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from reviews.lookups import LookupCache, categories, genres
+from reviews.models import Category, Genre
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18LookupCache:
+
+    def test_01_lookups_are_cached(self, django_assert_num_queries):
+        category = Category.objects.create(name='Фильм', slug='films')
+        with django_assert_num_queries(1):
+            assert categories.get_id('films') == category.id
+            assert categories.get_entry(category.id) == ('Фильм', 'films')
+            assert categories.get_id('films') == category.id
+        with django_assert_num_queries(1):
+            assert categories.get_id('nothing') is None
+
+    def test_02_lru_is_bounded(self, django_assert_num_queries):
+        lookup = LookupCache(Genre, maxsize=2)
+        for slug in ('horror', 'comedy', 'drama'):
+            Genre.objects.create(name=slug, slug=slug)
+            lookup.get_id(slug)
+        with django_assert_num_queries(0):
+            lookup.get_id('drama')
+            lookup.get_id('comedy')
+        with django_assert_num_queries(1):
+            lookup.get_id('horror')
+
+    def test_03_signals_invalidate(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['category']['name'] == 'Фильм'
+        category = Category.objects.get(slug='films')
+        category.name = 'Кино'
+        category.save()
+        assert client.get(url).json()['category'] == {
+            'name': 'Кино', 'slug': 'films'
+        }, 'Изменение категории должно сбрасывать кэш справочников.'
+        Genre.objects.get(slug='drama').delete()
+        response = admin_client.patch(url, data={'genre': ['drama']})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Удаленный жанр не должен находиться через кэш справочников.'
+        )
+
+    def test_04_version_key_syncs_workers(self, settings,
+                                          django_assert_num_queries):
+        settings.LOOKUP_CACHE_SYNC_INTERVAL = 0
+        genre = Genre.objects.create(name='Ужасы', slug='horror')
+        assert genres.get_id('horror') == genre.id
+        with django_assert_num_queries(0):
+            genres.get_id('horror')
+        # Другой процесс изменил жанр и сменил версию в общем кэше.
+        cache.set(genres.version_key, 'other-worker', None)
+        with django_assert_num_queries(1):
+            genres.get_id('horror')
+
+    def test_05_title_write_uses_cache(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Чужие', 'year': 1986, 'category': 'unknown',
+            'genre': ['horror'],
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'category' in response.json()
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Чужие', 'year': 1986, 'category': 'films',
+            'genre': ['horror', 'drama'],
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        data = response.json()
+        assert data['category'] == 'films'
+        assert sorted(data['genre']) == ['drama', 'horror']
+
+    def test_06_cold_list_loads_lookups_in_bulk(self, client, admin_client):
+        create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as warm:
+            client.get('/api/v1/titles/')
+        categories.clear()
+        genres.clear()
+        with CaptureQueriesContext(connection) as cold:
+            client.get('/api/v1/titles/')
+        assert len(cold) <= len(warm) + 2, (
+            'Холодный кэш должен загружать каждый справочник одним запросом, '
+            'а не по запросу на запись.'
+        )
+
+    def test_07_invalidated_after_commit(self):
+        genre = Genre.objects.create(name='Ужасы', slug='horror')
+        genres.get_id('horror')
+        version = cache.get(genres.version_key)
+        with transaction.atomic():
+            genre.delete()
+            assert cache.get(genres.version_key) == version, (
+                'Версия справочника меняется только после фиксации.'
+            )
+        assert cache.get(genres.version_key) != version
+        assert genres.get_id('horror') is None
@@ -0,0 +1,82 @@
+import gzip
+import io
+import json
+import re
+from http import HTTPStatus
+
+import pytest
+import yaml
+from django.conf import settings
+from django.core.management import call_command
+
+from api import redoc
+from api.compression import choose_encoding
+
+
+@pytest.fixture
+def redoc_build(settings, tmp_path):
+    settings.REDOC_BUILD_DIR = tmp_path
+    redoc.get_bundle.cache_clear()
+    yield tmp_path
+    redoc.get_bundle.cache_clear()
+
+
+def get_spec_url(client):
+    response = client.get('/redoc/')
+    assert response.status_code == HTTPStatus.OK
+    match = re.search(r"spec-url='([^']+)'", response.content.decode())
+    assert match, 'Страница ReDoc должна ссылаться на спецификацию.'
+    return match.group(1)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Redoc:
+
+    def test_01_page_and_spec(self, client, redoc_build):
+        spec_url = get_spec_url(client)
+        assert re.fullmatch(r'/redoc/[0-9a-f]{16}\.json', spec_url), (
+            'Адрес спецификации должен содержать хеш содержимого.'
+        )
+        response = client.get(spec_url)
+        assert response.status_code == HTTPStatus.OK
+        assert 'immutable' in response['Cache-Control']
+        with open(settings.REDOC_SOURCE, encoding='utf-8') as file:
+            spec = json.loads(json.dumps(yaml.safe_load(file)))
+        assert json.loads(response.content) == spec
+
+        response = client.get(spec_url, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        assert json.loads(gzip.decompress(response.content))
+
+        response = client.get(spec_url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        assert not response.has_header('Content-Encoding')
+
+        assert client.get('/redoc/0000000000000000.json').status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+
+    def test_02_page_etag(self, client, redoc_build):
+        response = client.get('/redoc/')
+        response = client.get('/redoc/', HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Страница ReDoc должна поддерживать условные запросы.'
+        )
+
+    def test_03_build_command(self, client, redoc_build):
+        call_command('build_redoc', stdout=io.StringIO())
+        bundle = redoc.read_bundle(redoc_build)
+        assert bundle is not None
+        assert (redoc_build / f'{bundle.spec_name}.gz').exists()
+        assert get_spec_url(client) == f'/redoc/{bundle.spec_name}'
+
+    @pytest.mark.parametrize('header,expected', (
+        ('', 'identity'),
+        ('gzip, deflate, br', 'br'),
+        ('gzip;q=0.5, br;q=0', 'gzip'),
+        ('*', 'br'),
+        ('identity', 'identity'),
+    ))
+    def test_04_choose_encoding(self, header, expected):
+        available = {'identity': b'', 'gzip': b'', 'br': b''}
+        assert choose_encoding(header, available) == expected
@@ -0,0 +1,136 @@
+import gzip
+import json
+import zlib
+from http import HTTPStatus
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from api.compression import (
+    COMPRESSORS, CompressionMiddleware, choose_encoding
+)
+from tests.utils import create_single_review, create_titles
+
+LONG_TEXT = 'Отличное произведение, рекомендую к просмотру. ' * 40
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Compression:
+
+    def create_review_page(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], LONG_TEXT, 7)
+        return f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+    def test_01_api_responses_are_compressed(self, client, admin_client,
+                                             user_client):
+        url = self.create_review_page(admin_client, user_client)
+        plain = client.get(url)
+        assert not plain.has_header('Content-Encoding')
+        assert 'Accept-Encoding' in plain['Vary']
+        response = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Encoding'] == 'gzip', (
+            'Большие ответы API должны сжиматься, если клиент принимает '
+            'gzip.'
+        )
+        assert int(response['Content-Length']) == len(response.content)
+        assert len(response.content) * 4 < len(plain.content)
+        assert json.loads(gzip.decompress(response.content)) == plain.json()
+
+    def test_02_small_and_foreign_responses(self, client, admin_client):
+        response = client.get(
+            '/api/v1/genres/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert not response.has_header('Content-Encoding'), (
+            'Ответы меньше порога сжимать не нужно.'
+        )
+        response = client.get('/admin/login/', HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding'), (
+            'Сжимаются только ответы API.'
+        )
+
+    def test_03_level_and_threshold_settings(self, settings, client,
+                                             admin_client, user_client):
+        url = self.create_review_page(admin_client, user_client)
+        settings.COMPRESSION_LEVELS = {'gzip': 1}
+        fast = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert fast['Content-Encoding'] == 'gzip'
+        settings.COMPRESSION_MIN_SIZE = 10 ** 6
+        response = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding')
+
+    def test_04_streaming_response_is_compressed(self):
+        chunks = [LONG_TEXT.encode()] * 3
+        middleware = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(iter(chunks))
+        )
+        request = RequestFactory().get(
+            '/api/v1/export/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        response = middleware(request)
+        assert response['Content-Encoding'] == 'gzip'
+        assert not response.has_header('Content-Length')
+        parts = list(response.streaming_content)
+        assert len(parts) > 1, 'Поток должен сжиматься по частям.'
+        assert zlib.decompress(b''.join(parts), 31) == b''.join(chunks)
+
+    def test_05_encoded_responses_are_left_alone(self):
+        body = LONG_TEXT.encode()
+
+        def get_response(request):
+            response = HttpResponse(body)
+            response['Cache-Control'] = 'no-transform'
+            return response
+
+        request = RequestFactory().get(
+            '/api/v1/titles/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        response = CompressionMiddleware(get_response)(request)
+        assert response.content == body
+        assert not response.has_header('Content-Encoding')
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip', 'gzip'),
+    ('*', 'gzip'),
+    ('gzip;q=0, *', 'identity'),
+    ('gzip; q=0.0, identity', 'identity'),
+    ('deflate, gzip;q=0.5', 'gzip'),
+    ('', 'identity'),
+])
+def test_06_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding, {'gzip': None}) == expected
+
+
+@pytest.mark.parametrize('encoding, module_name', [
+    ('br', 'brotli'), ('zstd', 'zstandard'),
+])
+def test_07_optional_encodings(encoding, module_name):
+    module = pytest.importorskip(module_name)
+    decompress = (
+        module.decompress if encoding == 'br'
+        else lambda data: module.ZstdDecompressor().decompressobj(
+        ).decompress(data)
+    )
+    body = LONG_TEXT.encode()
+    assert choose_encoding(f'gzip, {encoding}', COMPRESSORS) == encoding
+    request = RequestFactory().get(
+        '/api/v1/titles/', HTTP_ACCEPT_ENCODING=encoding
+    )
+    response = CompressionMiddleware(lambda request: HttpResponse(body))(
+        request
+    )
+    assert response['Content-Encoding'] == encoding
+    assert decompress(response.content) == body
+
+    chunks = [body] * 3
+    middleware = CompressionMiddleware(
+        lambda request: StreamingHttpResponse(iter(chunks))
+    )
+    response = middleware(request)
+    assert response['Content-Encoding'] == encoding
+    parts = list(response.streaming_content)
+    assert len(parts) > 1, 'Поток должен сжиматься по частям.'
+    assert decompress(b''.join(parts)) == b''.join(chunks)
@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import Client
+
+from reviews.admin import EstimatedCountPaginator
+from reviews.models import Comment, Review, Title
+from tests.utils import create_titles
+
+REVIEWS_URL = '/admin/reviews/review/'
+COMMENTS_URL = '/admin/reviews/comment/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Admin:
+
+    @pytest.fixture
+    def site_client(self, user_superuser):
+        client = Client()
+        client.force_login(user_superuser)
+        return client
+
+    def create_reviews(self, admin_client, users, count_per_user=1):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        reviews = [
+            Review.objects.create(
+                author=user, title=title, text='текст', score=5
+            )
+            for user in users
+        ]
+        for review in reviews:
+            Comment.objects.create(
+                author=review.author, review=review, text='комментарий'
+            )
+        return title, reviews
+
+    def test_01_changelists_do_not_grow_with_data(
+            self, site_client, admin_client, django_user_model,
+            django_assert_max_num_queries):
+        users = [
+            django_user_model.objects.create_user(
+                username=f'reader{i}', email=f'reader{i}@yamdb.fake'
+            )
+            for i in range(20)
+        ]
+        self.create_reviews(admin_client, users)
+        for url in (REVIEWS_URL, COMMENTS_URL):
+            with django_assert_max_num_queries(8):
+                response = site_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            content = response.content.decode()
+            assert 'reader19' not in content.split('id="changelist-filter"')[
+                -1
+            ], (
+                'Фильтр по автору не должен выводить всех пользователей.'
+            )
+
+    def test_02_autocomplete_filter(self, site_client, admin_client, user,
+                                    moderator):
+        _, reviews = self.create_reviews(admin_client, [user, moderator])
+        response = site_client.get(
+            REVIEWS_URL, {'author__id__exact': user.id}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert list(response.context['cl'].result_list) == [reviews[0]]
+        assert 'admin-autocomplete' in response.content.decode()
+        response = site_client.get(
+            COMMENTS_URL, {'review__id__exact': reviews[1].id}
+        )
+        assert [
+            comment.review_id for comment in response.context['cl'].result_list
+        ] == [reviews[1].id]
+        response = site_client.get('/admin/autocomplete/', {
+            'app_label': 'reviews', 'model_name': 'review',
+            'field_name': 'author', 'term': 'TestU',
+        })
+        assert [item['id'] for item in response.json()['results']] == [
+            str(user.id)
+        ]
+
+    def test_03_search(self, site_client, admin_client, user, moderator):
+        title, reviews = self.create_reviews(
+            admin_client, [user, moderator]
+        )
+        for term, expected in (
+            (user.username, [reviews[0]]),
+            (title.name[:4], sorted(reviews, key=lambda r: r.id)),
+            (str(reviews[1].id), [reviews[1]]),
+            ('текст', []),
+        ):
+            response = site_client.get(REVIEWS_URL, {'q': term})
+            result = sorted(
+                response.context['cl'].result_list, key=lambda r: r.id
+            )
+            assert result == expected, f'Поиск отзывов по `{term}`.'
+        response = site_client.get(
+            COMMENTS_URL, {'q': moderator.username}
+        )
+        assert [
+            comment.author for comment in response.context['cl'].result_list
+        ] == [moderator]
+
+    def test_04_paginator_counts_exactly_without_statistics(
+            self, admin_client, user):
+        self.create_reviews(admin_client, [user])
+        paginator = EstimatedCountPaginator(Review.objects.all(), 10)
+        assert paginator.count == 1
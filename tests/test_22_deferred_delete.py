@@ -0,0 +1,159 @@
+import io
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews import purge
+from reviews.models import Comment, LeaderboardEntry, Review, Title
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22DeferredDelete:
+
+    @pytest.fixture(autouse=True)
+    def defer_everything(self, settings):
+        settings.DEFERRED_DELETE_THRESHOLD = 0
+
+    def create_data(self, admin_client, user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        reviews = [
+            create_single_review(client, title_id, 'текст', score).json()
+            for client, score in ((user_client, 2), (moderator_client, 8))
+        ]
+        for review in reviews:
+            create_single_comment(
+                moderator_client, title_id, review['id'], 'комментарий'
+            )
+        return title_id, reviews
+
+    def purge(self):
+        call_command('purge_deleted', batch_size=1, stdout=io.StringIO())
+
+    def test_01_title(self, client, admin_client, user_client,
+                      moderator_client):
+        title_id, reviews = self.create_data(
+            admin_client, user_client, moderator_client
+        )
+        url = f'/api/v1/titles/{title_id}/'
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert Title.objects.deleted().filter(pk=title_id).exists(), (
+            'Произведение с большим поддеревом должно только помечаться.'
+        )
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+        assert client.get(f'{url}reviews/').status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+        assert client.get(
+            f'{url}reviews/{reviews[0]["id"]}/comments/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert title_id not in [
+            item['id'] for item in client.get('/api/v1/titles/').json()[
+                'results'
+            ]
+        ]
+        assert not LeaderboardEntry.objects.filter(title_id=title_id).exists()
+
+        self.purge()
+        assert not Title.objects.filter(pk=title_id).exists()
+        assert not Review.objects.filter(title_id=title_id).exists()
+        assert not Comment.objects.exists()
+
+    def test_02_review(self, client, admin_client, user_client,
+                       moderator_client):
+        title_id, reviews = self.create_data(
+            admin_client, user_client, moderator_client
+        )
+        url = f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        assert user_client.delete(url).status_code == HTTPStatus.NO_CONTENT
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+        assert client.get(f'{url}comments/').status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+        assert client.get(f'/api/v1/titles/{title_id}/').json()[
+            'rating'
+        ] == 8, 'Оценка удаленного отзыва сразу убирается из рейтинга.'
+
+        response = create_single_review(user_client, title_id, 'снова', 4)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Помеченный отзыв не должен мешать написать новый.'
+        )
+        assert client.get(f'/api/v1/titles/{title_id}/').json()[
+            'rating'
+        ] == 6
+
+    def test_03_user(self, client, admin_client, user_client, user,
+                     moderator_client):
+        title_id, reviews = self.create_data(
+            admin_client, user_client, moderator_client
+        )
+        url = f'/api/v1/users/{user.username}/'
+        assert admin_client.delete(url).status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Помеченный на удаление пользователь не должен входить.'
+
+        self.purge()
+        assert not type(user).objects.filter(pk=user.pk).exists()
+        assert list(Review.objects.values_list('id', flat=True)) == [
+            reviews[1]['id']
+        ]
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating, title.reviews_count, title.score_2) == (
+            8, 1, 0
+        ), 'Фоновое удаление отзывов должно обновлять гистограмму.'
+
+    def test_04_purge_is_batched(self, admin_client, user_client,
+                                 moderator_client):
+        title_id, _ = self.create_data(
+            admin_client, user_client, moderator_client
+        )
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        steps = []
+        while True:
+            deleted = purge.purge_step(batch_size=1)
+            if not deleted:
+                break
+            steps.append(deleted)
+        assert steps and max(steps) == 1, (
+            'За один шаг удаляется не больше batch_size строк.'
+        )
+
+    def test_05_small_subtrees_are_deleted_at_once(self, settings,
+                                                   admin_client):
+        settings.DEFERRED_DELETE_THRESHOLD = 1000
+        titles, _, _ = create_titles(admin_client)
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert not Title.objects.filter(pk=titles[0]['id']).exists()
+
+    def test_06_new_review_leaves_previous_to_purge(
+            self, admin_client, user_client, moderator_client):
+        title_id, reviews = self.create_data(
+            admin_client, user_client, moderator_client
+        )
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        user_client.delete(f'{url}{reviews[0]["id"]}/')
+        with CaptureQueriesContext(connection) as context:
+            response = create_single_review(user_client, title_id, 'снова', 4)
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any(
+            query['sql'].startswith('DELETE')
+            for query in context.captured_queries
+        ), 'Новый отзыв не должен удалять прежний в запросе.'
+        assert Review.objects.deleted().filter(pk=reviews[0]['id']).exists()
+        assert user_client.post(
+            url, data={'text': 'еще раз', 'score': 5}
+        ).status_code == HTTPStatus.BAD_REQUEST
+
+        self.purge()
+        assert not Review.objects.filter(pk=reviews[0]['id']).exists()
+        assert not Comment.objects.filter(review_id=reviews[0]['id']).exists()
+        assert Review.objects.filter(pk=response.json()['id']).exists()
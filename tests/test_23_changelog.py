@@ -0,0 +1,129 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews import changelog
+from reviews.models import ChangeLogEntry, Title
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+URL = '/api/v1/changes/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ChangeLog:
+
+    def changes(self, client, **params):
+        response = client.get(URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_writes_are_logged(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'текст', 5).json()
+        comment = create_single_comment(
+            user_client, title_id, review['id'], 'комментарий'
+        ).json()
+        review_url = f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        user_client.patch(review_url, data={'score': 7})
+        user_client.delete(f'{review_url}comments/{comment["id"]}/')
+        user_client.delete(review_url)
+
+        entries = [
+            (entry['model'], entry['action'], entry['object_id'])
+            for entry in self.changes(admin_client)['results']
+            if entry['title'] == title_id
+        ]
+        assert entries == [
+            ('title', 'create', title_id),
+            ('review', 'create', review['id']),
+            ('comment', 'create', comment['id']),
+            ('review', 'update', review['id']),
+            ('comment', 'delete', comment['id']),
+            ('review', 'delete', review['id']),
+        ], 'Каждое изменение должно попадать в журнал по порядку.'
+        update = ChangeLogEntry.objects.get(
+            model='review', action='update'
+        )
+        assert update.data['score'] == 7, (
+            'Запись об изменении должна содержать представление объекта.'
+        )
+
+    def test_02_since_paging(self, admin_client):
+        create_titles(admin_client)
+        total = ChangeLogEntry.objects.count()
+        seen = []
+        since = 0
+        while True:
+            page = self.changes(admin_client, since=since, limit=1)
+            seen += [entry['sequence'] for entry in page['results']]
+            since = page['next_since']
+            if not page['has_more']:
+                break
+        assert seen == sorted(seen) and len(seen) == total, (
+            'Страницы ленты должны покрывать журнал без пропусков.'
+        )
+        assert self.changes(admin_client, since=since)['results'] == []
+
+    def test_03_filters(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        page = self.changes(admin_client, title=titles[1]['id'])
+        assert [entry['object_id'] for entry in page['results']] == [
+            titles[1]['id']
+        ]
+        response = admin_client.get(URL, {'since': 'x'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_admin_only(self, client, user_client, moderator_client):
+        assert client.get(URL).status_code == HTTPStatus.UNAUTHORIZED
+        for not_admin in (user_client, moderator_client):
+            assert not_admin.get(URL).status_code == HTTPStatus.FORBIDDEN
+
+    def test_05_user_delete(self, admin_client, user_client, user,
+                            moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'текст', 5).json()
+        create_single_comment(
+            moderator_client, title_id, review['id'], 'ответ'
+        )
+        other = create_single_review(
+            moderator_client, title_id, 'другой', 3
+        ).json()
+        comment = create_single_comment(
+            user_client, title_id, other['id'], 'комментарий'
+        ).json()
+        since = ChangeLogEntry.objects.latest('sequence').sequence
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        entries = {
+            (entry['model'], entry['object_id'])
+            for entry in self.changes(admin_client, since=since)['results']
+        }
+        assert entries == {
+            ('review', review['id']), ('comment', comment['id'])
+        }, (
+            'Удаление пользователя записывает удаление его отзывов '
+            'и комментариев, но не комментариев к его отзывам.'
+        )
+
+    def test_06_numbered_at_commit(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        last = ChangeLogEntry.objects.latest('sequence').sequence
+        # Запись из еще не завершенной транзакции номера не имеет
+        # и в ленту не попадает.
+        changelog.record(changelog.UPDATE, title)
+        pending = ChangeLogEntry.objects.get(sequence__isnull=True)
+        assert self.changes(admin_client, since=last)['results'] == []
+        with changelog.atomic():
+            changelog.record(changelog.DELETE, title)
+            assert ChangeLogEntry.objects.filter(
+                sequence__isnull=True
+            ).count() == 2, 'Номер выдается только в конце транзакции.'
+        entries = self.changes(admin_client, since=last)['results']
+        assert [entry['action'] for entry in entries] == ['update', 'delete']
+        assert entries[0]['sequence'] > last
+        pending.refresh_from_db()
+        assert pending.sequence == entries[0]['sequence']
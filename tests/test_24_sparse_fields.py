@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SparseFields:
+
+    def get(self, client, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK
+        return response.json(), [query['sql'] for query in queries]
+
+    def test_01_titles(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        data, queries = self.get(
+            client, '/api/v1/titles/', fields='id,name,rating'
+        )
+        assert all(
+            set(item) == {'id', 'name', 'rating'} for item in data['results']
+        ), 'В ответе должны остаться только запрошенные поля.'
+        sql = ' '.join(queries)
+        assert '"description"' not in sql, (
+            'Незапрошенные колонки не должны загружаться из базы.'
+        )
+        assert 'reviews_title_genre' not in sql, (
+            'Без поля genre жанры не должны подгружаться.'
+        )
+
+        data, queries = self.get(
+            client, f'/api/v1/titles/{titles[0]["id"]}/', fields='genre,scores'
+        )
+        assert set(data) == {'genre', 'scores'}
+        assert len(data['genre']) == 2
+
+    def test_02_reviews_and_comments(self, client, admin_client,
+                                     user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'текст', 5).json()
+        create_single_comment(user_client, title_id, review['id'], 'ответ')
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        data, queries = self.get(client, url, fields='id,score')
+        assert data['results'] == [{'id': review['id'], 'score': 5}]
+        assert 'users_myuser' not in queries[-1], (
+            'Без поля author автор не должен присоединяться.'
+        )
+        data, _ = self.get(
+            client, f'{url}{review["id"]}/comments/', fields='author'
+        )
+        assert data['results'] == [{'author': 'TestUser'}]
+
+    def test_03_users(self, admin_client):
+        data, _ = self.get(admin_client, '/api/v1/users/', fields='username')
+        assert data['results'] and all(
+            list(item) == ['username'] for item in data['results']
+        )
+
+    def test_04_unknown_field(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/', {'fields': 'id,secret'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'fields' in response.json()
+
+    def test_05_writes_ignore_fields(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/?fields=id',
+            data={'year': 1990}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['year'] == 1990
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Expand:
+
+    def create_data(self, admin_client, clients, comments=4):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        reviews = [
+            create_single_review(client, title_id, f'отзыв {score}', score)
+            .json()
+            for score, client in enumerate(clients, start=1)
+        ]
+        for review in reviews:
+            for number in range(comments):
+                create_single_comment(
+                    admin_client, title_id, review['id'], f'ответ {number}'
+                )
+        return title_id, reviews
+
+    def test_01_reviews_and_comments(self, client, admin_client,
+                                     user_client, moderator_client):
+        title_id, reviews = self.create_data(
+            admin_client, (user_client, moderator_client)
+        )
+        response = client.get(
+            f'/api/v1/titles/{title_id}/',
+            {'expand': 'reviews,reviews.comments', 'comments_limit': 2}
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['id'] == title_id and 'scores' in data
+        assert [review['id'] for review in data['reviews']] == [
+            reviews[1]['id'], reviews[0]['id']
+        ], 'Отзывы встраиваются в порядке списка отзывов.'
+        for review in data['reviews']:
+            assert [comment['text'] for comment in review['comments']] == [
+                'ответ 3', 'ответ 2'
+            ], 'К каждому отзыву встраиваются последние comments_limit.'
+
+    def test_02_fixed_number_of_queries(self, client, admin_client,
+                                        user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        counts = []
+        for title, clients in zip(
+            titles, ((user_client,), (user_client, moderator_client))
+        ):
+            for author in clients:
+                review = create_single_review(
+                    author, title['id'], 'отзыв', 5
+                ).json()
+                for _ in range(3):
+                    create_single_comment(
+                        admin_client, title['id'], review['id'], 'ответ'
+                    )
+            with CaptureQueriesContext(connection) as queries:
+                client.get(
+                    f'/api/v1/titles/{title["id"]}/',
+                    {'expand': 'reviews.comments'}
+                )
+            counts.append(len(queries))
+        assert counts[0] == counts[1], (
+            'Число запросов не должно зависеть от числа отзывов.'
+        )
+
+    def test_03_limits_and_validation(self, client, admin_client,
+                                      user_client, moderator_client):
+        title_id, _ = self.create_data(
+            admin_client, (user_client, moderator_client), comments=1
+        )
+        url = f'/api/v1/titles/{title_id}/'
+        data = client.get(url, {
+            'expand': 'reviews', 'reviews_limit': 1
+        }).json()
+        assert len(data['reviews']) == 1
+        assert 'comments' not in data['reviews'][0]
+        assert 'reviews' not in client.get(url).json()
+        assert client.get(url, {'expand': 'author'}).status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+        assert client.get(url, {
+            'expand': 'reviews', 'reviews_limit': 'all'
+        }).status_code == HTTPStatus.BAD_REQUEST
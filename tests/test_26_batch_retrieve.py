@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26BatchRetrieve:
+
+    TITLES_BATCH_URL = '/api/v1/titles/batch/'
+
+    def test_01_titles_keep_order(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        response = client.get(
+            self.TITLES_BATCH_URL, {'ids': f'{second},0,{first},{second}'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            second, first
+        ], 'Объекты возвращаются в порядке ids без повторов.'
+        assert data['missing'] == [0]
+        assert {'genre', 'category', 'rating'} <= set(data['results'][0])
+
+    def test_02_post_for_long_lists(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        ids = [title['id'] for title in reversed(titles)]
+        response = client.post(
+            self.TITLES_BATCH_URL, {'ids': ids},
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'POST-вариант доступен без прав на запись.'
+        )
+        assert [title['id'] for title in response.json()['results']] == ids
+
+    def test_03_reviews(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'текст', 5
+        ).json()
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/batch/'
+        data = client.get(url, {'ids': f'{review["id"]}'}).json()
+        assert data == {'results': [review], 'missing': []}
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/batch/'
+        data = client.get(other_url, {'ids': f'{review["id"]}'}).json()
+        assert data['missing'] == [review['id']], (
+            'Отзывы другого произведения считаются не найденными.'
+        )
+
+    def test_04_validation(self, settings, client):
+        settings.BATCH_MAX_IDS = 2
+        for params in ({}, {'ids': 'a,b'}, {'ids': '1,2,3'}):
+            response = client.get(self.TITLES_BATCH_URL, params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, params
+        response = client.post(
+            self.TITLES_BATCH_URL, {'ids': 'oops'},
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
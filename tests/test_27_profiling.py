@@ -0,0 +1,57 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Profiling:
+
+    URL = '/api/v1/titles/'
+
+    def test_01_admin_gets_report(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.get(self.URL, {'profile': 1})
+        assert response.status_code == HTTPStatus.OK
+        assert 'db;dur=' in response['Server-Timing']
+        report_url = response['X-Profile-URL']
+        assert report_url.endswith(f'{response["X-Profile-Id"]}/')
+
+        report = admin_client.get(report_url).json()
+        assert report['path'] == f'{self.URL}?profile=1'
+        assert report['status'] == HTTPStatus.OK
+        assert report['query_count'] == len(report['queries']) > 0
+        assert all(
+            query['sql'] and query['ms'] >= 0 for query in report['queries']
+        )
+        assert report['functions'] and report['serializer_ms'] > 0, (
+            'Отчет должен содержать функции и время сериализаторов.'
+        )
+
+    def test_02_header(self, admin_client):
+        response = admin_client.get(self.URL, HTTP_X_PROFILE='1')
+        assert 'X-Profile-Id' in response
+
+    def test_03_not_admin(self, client, user_client):
+        for not_admin in (client, user_client):
+            response = not_admin.get(self.URL, {'profile': 1})
+            assert response.status_code == HTTPStatus.OK
+            assert 'X-Profile-Id' not in response, (
+                'Профилирование доступно только администратору.'
+            )
+
+    def test_04_report_access(self, admin_client, user_client):
+        response = admin_client.get(self.URL, {'profile': 1})
+        report_url = response['X-Profile-URL']
+        assert user_client.get(report_url).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        assert admin_client.get(
+            '/api/v1/profiles/unknown/'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_off_by_default(self, admin_client):
+        response = admin_client.get(self.URL)
+        assert 'X-Profile-Id' not in response
+        assert 'Server-Timing' not in response
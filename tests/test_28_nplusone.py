@@ -0,0 +1,82 @@
+import logging
+
+import pytest
+
+from api.nplusone import NPlusOneError
+from api.views import ReviewViewSet, TitleViewSet
+from reviews.lookups import LOOKUPS
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28NPlusOne:
+
+    def create_reviews(self, admin_client, clients):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        for score, client in enumerate(clients, start=1):
+            create_single_review(client, title_id, 'текст', score)
+        return title_id
+
+    def test_01_lazy_foreign_key(self, monkeypatch, client, admin_client,
+                                 user_client, moderator_client):
+        title_id = self.create_reviews(
+            admin_client, (admin_client, user_client, moderator_client)
+        )
+        monkeypatch.setattr(
+            ReviewViewSet, 'get_queryset',
+            lambda self: self.get_title().reviews.alive()
+        )
+        with pytest.raises(NPlusOneError) as error:
+            client.get(f'/api/v1/titles/{title_id}/reviews/')
+        assert 'ReviewSerializer.author' in str(error.value)
+        assert 'reviews.Review.author' in str(error.value), (
+            'Ошибка должна называть поле сериализатора и связь модели.'
+        )
+
+    def test_02_lazy_many_to_many(self, monkeypatch, client, admin_client):
+        create_titles(admin_client)
+        monkeypatch.setattr(
+            TitleViewSet, 'queryset', Title.objects.alive().order_by('id')
+        )
+        with pytest.raises(NPlusOneError, match='TitleSerializer.genre'):
+            client.get('/api/v1/titles/')
+
+    def test_03_log_only(self, settings, monkeypatch, caplog, client,
+                         admin_client, user_client, moderator_client):
+        settings.NPLUSONE_RAISE = False
+        title_id = self.create_reviews(
+            admin_client, (admin_client, user_client, moderator_client)
+        )
+        monkeypatch.setattr(
+            ReviewViewSet, 'get_queryset',
+            lambda self: self.get_title().reviews.alive()
+        )
+        with caplog.at_level(logging.WARNING, logger='api.nplusone'):
+            response = client.get(f'/api/v1/titles/{title_id}/reviews/')
+        assert response.status_code == 200
+        assert 'ReviewSerializer.author' in caplog.text
+
+    def test_04_prefetched_requests_pass(self, client, admin_client,
+                                         user_client, moderator_client):
+        title_id = self.create_reviews(
+            admin_client, (admin_client, user_client, moderator_client)
+        )
+        assert client.get('/api/v1/titles/').status_code == 200
+        assert client.get(
+            f'/api/v1/titles/{title_id}/reviews/'
+        ).status_code == 200
+
+    def test_05_genre_slugs_in_one_query(self, settings, admin_client):
+        settings.NPLUSONE_REPEAT_THRESHOLD = 1
+        create_titles(admin_client)
+        for lookup in LOOKUPS.values():
+            lookup.clear()
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Чужой', 'year': 1979, 'genre': ['horror', 'drama'],
+            'category': 'films'
+        })
+        assert response.status_code == 201, (
+            'Слаги жанров, которых нет в кэше, ищутся одним запросом.'
+        )
@@ -0,0 +1,115 @@
+import json
+import logging
+from http import HTTPStatus
+
+import pytest
+
+from api import slow_queries
+from api.views import ReviewViewSet
+from tests.utils import create_single_review, create_titles
+
+
+def test_00_normalize():
+    assert slow_queries.normalize(
+        'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, %s, %s)\n'
+        "  AND \"a\".\"name\" = 'x''y' LIMIT 21"
+    ) == (
+        'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (...) '
+        'AND "a"."name" = ? LIMIT ?'
+    )
+    assert slow_queries.normalize(
+        'INSERT INTO "a" ("x", "y") VALUES (%s, %s), (%s, %s)'
+    ) == 'INSERT INTO "a" ("x", "y") VALUES (...), ...'
+    assert slow_queries.normalize(
+        'SELECT "score_10" FROM "t" WHERE "x" IN (%s)'
+    ) == 'SELECT "score_10" FROM "t" WHERE "x" IN (...)'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29SlowQueries:
+
+    @pytest.fixture(autouse=True)
+    def log_everything(self, settings):
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        settings.SLOW_QUERY_SAMPLE_RATE = 1
+        settings.NPLUSONE_ENABLED = False
+        slow_queries.stats.clear()
+        yield
+        slow_queries.stats.clear()
+
+    def entries(self, caplog):
+        return [
+            json.loads(record.getMessage()) for record in caplog.records
+            if record.name == 'api.slow_queries'
+        ]
+
+    def create_reviews(self, admin_client, clients):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        for score, client in enumerate(clients, start=1):
+            create_single_review(client, title_id, 'текст', score)
+        return title_id
+
+    def test_01_entry(self, caplog, client, admin_client, user_client):
+        title_id = self.create_reviews(admin_client, (user_client,))
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger='api.slow_queries'):
+            client.get(f'/api/v1/titles/{title_id}/reviews/')
+        entries = self.entries(caplog)
+        assert entries and all(
+            entry['view'] == 'ReviewViewSet' and entry['action'] == 'list'
+            for entry in entries
+        ), 'Запись должна называть представление и действие.'
+        assert all(
+            entry['ms'] >= 0 and entry['params'] >= 0 for entry in entries
+        )
+        assert any(
+            frame.startswith('api/views.py')
+            for entry in entries for frame in entry['stack']
+        ), 'Запись должна содержать кадры стека приложения.'
+
+    def test_02_serializer_field(self, monkeypatch, caplog, client,
+                                 admin_client, user_client):
+        title_id = self.create_reviews(admin_client, (user_client,))
+        monkeypatch.setattr(
+            ReviewViewSet, 'get_queryset',
+            lambda self: self.get_title().reviews.alive()
+        )
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger='api.slow_queries'):
+            client.get(f'/api/v1/titles/{title_id}/reviews/')
+        assert {
+            (entry['serializer_field'], entry['relation'])
+            for entry in self.entries(caplog)
+        } >= {('ReviewSerializer.author', 'reviews.Review.author')}
+
+    def test_03_sampling_and_aggregation(self, settings, caplog,
+                                         admin_client, user_client,
+                                         moderator_client):
+        title_id = self.create_reviews(
+            admin_client, (user_client, moderator_client)
+        )
+        settings.SLOW_QUERY_SAMPLE_RATE = 0
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        slow_queries.stats.clear()
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger='api.slow_queries'):
+            for _ in range(3):
+                user_client.get(url)
+        logged = [entry['sql'] for entry in self.entries(caplog)]
+        assert len(logged) == len(set(logged)), (
+            'Без выборки в лог попадает только первый запрос каждой формы.'
+        )
+        statements = admin_client.get(
+            '/api/v1/slow-queries/'
+        ).json()['statements']
+        assert {row['sql'] for row in statements} >= set(logged)
+        assert max(row['count'] for row in statements) >= 3
+        assert [row['total_ms'] for row in statements] == sorted(
+            (row['total_ms'] for row in statements), reverse=True
+        )
+
+    def test_04_admin_only(self, user_client):
+        assert user_client.get('/api/v1/slow-queries/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
@@ -0,0 +1,51 @@
+import io
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title
+
+SIZES = {'titles': 20, 'users': 15, 'genres': 4, 'categories': 2}
+
+
+def generate(*args, **options):
+    call_command(
+        'generate_data', *args, stdout=io.StringIO(), **SIZES, **options
+    )
+
+
+def read_tables(directory):
+    return {
+        path.name: path.read_text(encoding='utf-8')
+        for path in sorted(directory.iterdir())
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30GenerateData:
+
+    def test_01_same_seed_same_csv(self, tmp_path):
+        generate(seed=1, csv=tmp_path / 'first')
+        generate(seed=1, csv=tmp_path / 'second')
+        generate(seed=2, csv=tmp_path / 'other')
+        first = read_tables(tmp_path / 'first')
+        assert first == read_tables(tmp_path / 'second'), (
+            'Данные с одним --seed должны совпадать побайтно.'
+        )
+        assert first != read_tables(tmp_path / 'other')
+
+    def test_02_dates_are_anchored(self):
+        now = datetime(2022, 6, 1, tzinfo=timezone.utc)
+        generate('--now', '2022-06-01T00:00:00', seed=3, days=30)
+        assert Title.objects.count() == SIZES['titles']
+        assert Review.objects.exists(), 'Генератор должен создавать отзывы.'
+        for model in (Review, Comment):
+            dates = model.objects.values_list('pub_date', flat=True)
+            assert all(date <= now for date in dates), (
+                'Даты должны отсчитываться от --now.'
+            )
+        assert all(
+            date.year == 2022
+            for date in Review.objects.values_list('pub_date', flat=True)
+        )
@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +308,9 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+@async_to_sync
+async def asgi_get(path, **extra):
+    """GET через асинхронную цепочку обработчиков, как под ASGI."""
+    return await AsyncClient().get(path, **extra)